@@ -2,11 +2,17 @@ from dataclasses import dataclass
 import math
 import numpy as np
 
+from simulators.imu_sim.lib.filters import lpf_series, lpf_sos
+from simulators.imu_sim.lib.jit import HAVE_NUMBA, njit
+from simulators.imu_sim.lib.noise import NoisePool
+
 
 LSB_PER_G = {2: 16384.0, 4: 8192.0, 8: 4096.0, 16: 2048.0}
+G_MS2 = 9.80665
+INV_G_MS2 = 1.0 / G_MS2
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AccelSimConfig:
     range_g: int
     odr_hz: float
@@ -14,98 +20,235 @@ class AccelSimConfig:
     noise_density_g_sqrtHz: float
     use_lpf: bool
     lpf_cut_hz: float
+    dtype: type = np.float64    # internal state/noise precision (np.float32 halves memory traffic)
+
+
+@njit(cache=True)
+def _accel_step_kernel(a_world, R, bias, state, use_lpf, primed, alpha, one_minus_alpha,
+                       sigma, noise, range_g, lsb, counts_out, meas_out):
+    """
+    Scalar accelerometer pipeline: rotate, add gravity and bias, LPF, noise, clip and quantize.
+    'state' is updated in place; results are written into 'counts_out' and 'meas_out'.
+    """
+    a0 = a_world[0]; a1 = a_world[1]; a2 = a_world[2]
+    for i in range(3):
+        # Transform acceleration into sensor frame (unrolled 3x3 matvec) and convert to g. Earth
+        # gravity is [0, 0, 1] g in world frame (ENU Z up), so its sensor-frame image is R[:, 2].
+        a_lin_s = R[i, 0] * a0 + R[i, 1] * a1 + R[i, 2] * a2
+        a_biased = a_lin_s * INV_G_MS2 + R[i, 2] + bias[i]
+
+        # Optional LPF
+        if use_lpf:
+            if not primed:
+                # Prime the filter so the first output equals the first input
+                state[i] = a_biased
+            else:
+                # Standard 1st-order low-pass: y[n] = α*y[n-1] + (1-α)*x[n]
+                state[i] = alpha * state[i] + one_minus_alpha * a_biased
+            a_f = state[i]
+        else:
+            a_f = a_biased
+
+        # Add white Gaussian noise and clip to sensor range
+        a_clip = a_f + sigma * noise[i]
+        if a_clip < -range_g:
+            a_clip = -range_g
+        elif a_clip > range_g:
+            a_clip = range_g
+        meas_out[i] = a_clip
+
+        # Quantize to 16-bit integer counts
+        c = round(a_clip * lsb)
+        if c < -32768:
+            c = -32768
+        elif c > 32767:
+            c = 32767
+        counts_out[i] = c
+
+
+@njit(cache=True)
+def _accel_batch_kernel(a_world, R, bias, state, use_lpf, primed, alpha, one_minus_alpha,
+                        sigma, noise, range_g, lsb, counts_out, meas_out):
+    """
+    Same pipeline as _accel_step_kernel over N rows in one compiled loop ('R' is (N, 3, 3)).
+    """
+    for n in range(a_world.shape[0]):
+        a0 = a_world[n, 0]; a1 = a_world[n, 1]; a2 = a_world[n, 2]
+        for i in range(3):
+            a_lin_s = R[n, i, 0] * a0 + R[n, i, 1] * a1 + R[n, i, 2] * a2
+            a_biased = a_lin_s * INV_G_MS2 + R[n, i, 2] + bias[i]
+
+            if use_lpf:
+                if not primed:
+                    state[i] = a_biased
+                else:
+                    state[i] = alpha * state[i] + one_minus_alpha * a_biased
+                a_f = state[i]
+            else:
+                a_f = a_biased
+
+            a_clip = a_f + sigma * noise[n, i]
+            if a_clip < -range_g:
+                a_clip = -range_g
+            elif a_clip > range_g:
+                a_clip = range_g
+            meas_out[n, i] = a_clip
+
+            c = round(a_clip * lsb)
+            if c < -32768:
+                c = -32768
+            elif c > 32767:
+                c = 32767
+            counts_out[n, i] = c
+        primed = True
+
+
+def _lpf_alpha(cfg: AccelSimConfig) -> float | None:
+    """1st-order LPF coefficient for the config's ODR, or None when the LPF is disabled (cutoff <= 0)."""
+    if cfg.use_lpf and cfg.lpf_cut_hz > 0.0:
+        dt = 1.0 / cfg.odr_hz
+        return math.exp(-2.0 * math.pi * cfg.lpf_cut_hz * dt)
+    return None
+
+
+def _noise_sigma(cfg: AccelSimConfig, alpha: float | None) -> float:
+    """
+    Compute standard deviation of discrete-time noise based on noise density
+    and equivalent noise bandwidth of either LPF or Nyquist.
+    """
+    if alpha is not None:
+        bw_eq = (math.pi / 2.0) * cfg.lpf_cut_hz    # eq. bandwidth of 1st-order LPF
+    else:
+        bw_eq = 0.5 * cfg.odr_hz                    # Nyquist bandwidth
+    bw_eq = max(bw_eq, 1e-9)
+    return cfg.noise_density_g_sqrtHz * math.sqrt(bw_eq)
 
 
 class AccelSim:
-    def __init__(self, cfg: AccelSimConfig, seed: int | None = None) -> None:
+    # Streaming sensors are always ready to sample; a plain attribute avoids a call per tick
+    ready = True
+
+    def __init__(self, cfg: AccelSimConfig, seed: int | np.random.Generator | None = None) -> None:
         self.cfg   = cfg
-        self.state = np.zeros(3, dtype=float)
+        self._dtype = np.dtype(cfg.dtype)
+        self.state = np.zeros(3, dtype=self._dtype)
         self._rng  = np.random.default_rng(seed)
 
+        # Hot-path config values hoisted out of self.cfg
+        self._bias  = np.asarray(cfg.bias_g, dtype=self._dtype)
+        self._range = float(cfg.range_g)
+        self._lsb   = LSB_PER_G[cfg.range_g]
+
+        self._noise = NoisePool(self._rng, self._dtype)
+
         # LPF coefficient (1st-order). If cutoff <= 0, LPF is disabled.
-        if self.cfg.use_lpf and self.cfg.lpf_cut_hz > 0.0:
-            dt = 1.0 / self.cfg.odr_hz
-            self._alpha = math.exp(-2.0 * math.pi * self.cfg.lpf_cut_hz * dt)
-        else:
-            self._alpha = None
+        self._alpha = _lpf_alpha(cfg)
+        self._one_minus_alpha = (1.0 - self._alpha) if self._alpha is not None else None
+
+        # Kernel arguments resolved once, so the per-sample path carries no Optional checks
+        self._use_lpf = self._alpha is not None
+        self._k_alpha = self._alpha if self._use_lpf else 0.0
+        self._k_one_minus_alpha = self._one_minus_alpha if self._use_lpf else 0.0
+
+        # sosfilt form of the same LPF, used by step_batch
+        self._sos = lpf_sos(self._alpha, self._dtype) if self._use_lpf else None
 
         # Warm-start flag: ensures the first output equals the first input
         self._primed = (self._alpha is None)
 
         # Standard deviation of discrete noise
-        self._sigma = self._calc_sigma()
+        self._sigma = _noise_sigma(cfg, self._alpha)
 
 
-    def _calc_sigma(self) -> float:
-        """
-        Compute standard deviation of discrete-time noise based on noise density
-        and equivalent noise bandwidth of either LPF or Nyquist.
-        """
-        if self._alpha is not None:
-            bw_eq = (math.pi / 2.0) * self.cfg.lpf_cut_hz    # eq. bandwidth of 1st-order LPF
-        else:
-            bw_eq = 0.5 * self.cfg.odr_hz                    # Nyquist bandwidth
-        bw_eq = max(bw_eq, 1e-9)
-        return self.cfg.noise_density_g_sqrtHz * math.sqrt(bw_eq)
-
+    def filter_series(self, x: np.ndarray) -> np.ndarray:
+        """Run the LPF over an (N, 3) series of consecutive inputs, continuing from the current state."""
+        y = lpf_series(self._sos, self.state, self._primed, x)
+        self._primed = self._primed or x.shape[0] > 0
+        return y
 
-    def ready(self, dt: float) -> bool:
-        return True
 
-
-    def step(self, a_lin_world_ms2: np.ndarray, R_world_to_sensor: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    def step(self, a_lin_world_ms2: np.ndarray, R_world_to_sensor: np.ndarray,
+             counts_out: np.ndarray | None = None, meas_out: np.ndarray | None = None
+             ) -> tuple[np.ndarray, np.ndarray]:
         """
         Compute one accelerometer sample.
 
         Args:
             a_lin_world_ms2: linear acceleration (m/s², excluding gravity) in world frame.
             R_world_to_sensor: 3x3 rotation matrix (world → sensor).
+            counts_out: optional int16[3] buffer to write the counts into (e.g. a row of a
+                        preallocated output array). A new array is allocated when None.
+            meas_out: optional float64[3] buffer to write the measurement into.
 
         Returns:
             counts_int16[3]: quantized sensor counts.
             a_meas_g[3]: simulated measurement in g.
         """
-        g = 9.80665
-        # Transform acceleration into sensor frame
-        a_lin_s = R_world_to_sensor @ a_lin_world_ms2
-        g_s = R_world_to_sensor @ np.array([0.0, 0.0, +g])    # Earth gravity (ENU Z up)
-        a_true_g = (a_lin_s + g_s) / g
-
-        # Apply static bias
-        a_biased = a_true_g + self.cfg.bias_g
-
-        # Apply optional LPF
-        if self._alpha is not None:
-            self.state = self._alpha * self.state + (1.0 - self._alpha) * a_biased
-            a_f = self.state
-        else:
-            a_f = a_biased
-        
-        if self._alpha is not None:
-            if not self._primed:
-                # Prime the filter so the first output equals the first input
-                self.state[:] = a_biased
-                self._primed = True
-            else:
-                # Standard 1st-order low-pass: y[n] = α*y[n-1] + (1-α)*x[n]
-                self.state = self._alpha * self.state + (1.0 - self._alpha) * a_biased
-            a_f = self.state
-        else:
-            a_f = a_biased
-        
-        # Add white Gaussian noise
-        noise = self._rng.normal(0.0, self._sigma, size=3)
-        a_noisy = a_f + noise
+        counts = np.empty(3, dtype=np.int16) if counts_out is None else counts_out
+        a_meas = np.empty(3, dtype=float) if meas_out is None else meas_out
+        _accel_step_kernel(a_lin_world_ms2, R_world_to_sensor, self._bias, self.state,
+                           self._use_lpf, self._primed, self._k_alpha, self._k_one_minus_alpha,
+                           self._sigma, self._noise.next(),
+                           self._range, self._lsb, counts, a_meas)
+        self._primed = True
+        return counts, a_meas
+
+
+    def step_batch(self, a_lin_world_ms2: np.ndarray, R_world_to_sensor: np.ndarray
+                   ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Compute N consecutive accelerometer samples at once.
 
-        # Clip to sensor range
-        rng = self.cfg.range_g
-        a_clip = np.clip(a_noisy, -rng, +rng)
+        Args:
+            a_lin_world_ms2: (N, 3) linear accelerations (m/s², excluding gravity) in world frame.
+            R_world_to_sensor: a single 3x3 rotation (world → sensor) or an (N, 3, 3) stack.
+
+        Returns:
+            counts_int16[N, 3]: quantized sensor counts.
+            a_meas_g[N, 3]: simulated measurements in g.
+
+        The LPF state is shared with step(), so batches and single steps can be interleaved.
+        For float64 the result equals N step() calls. For float32, inputs and the NumPy path
+        are single precision while step() computes in double, so results agree only to float32
+        tolerance and counts may differ by 1 LSB at rounding boundaries.
+        """
+        a = np.asarray(a_lin_world_ms2, dtype=self._dtype).reshape(-1, 3)
+        R = np.asarray(R_world_to_sensor, dtype=self._dtype)
+        n = a.shape[0]
+
+        # With Numba, run the fused per-sample kernel over all rows in a single compiled loop
+        if HAVE_NUMBA:
+            counts = np.empty((n, 3), dtype=np.int16)
+            a_meas = np.empty((n, 3), dtype=float)
+            _accel_batch_kernel(a, np.broadcast_to(R, (n, 3, 3)), self._bias, self.state,
+                                self._use_lpf, self._primed, self._k_alpha, self._k_one_minus_alpha,
+                                self._sigma, self._noise.take(n),
+                                self._range, self._lsb, counts, a_meas)
+            self._primed = self._primed or n > 0
+            return counts, a_meas
+
+        # Transform acceleration into sensor frame in g and add gravity (R[..., :, 2], in g)
+        # R[..., j] is column j for a single rotation or per row for a stack; the explicit sum
+        # keeps the kernels' summation order, so both step_batch paths round identically
+        a_s = a[:, 0:1] * R[..., 0] + a[:, 1:2] * R[..., 1] + a[:, 2:3] * R[..., 2]
+        a_s = a_s * INV_G_MS2 + R[..., 2]
+        a_biased = a_s + self._bias
+
+        # Apply optional LPF as one compiled IIR sweep, warm-started from the current state
+        a_f = self.filter_series(a_biased)
+
+        # Add white Gaussian noise and clip to sensor range
+        rng = self._range
+        a_clip = a_f + self._sigma * self._noise.take(n)
+        np.minimum(a_clip, rng, out=a_clip)
+        np.maximum(a_clip, -rng, out=a_clip)
 
         # Quantize to 16-bit integer counts
-        lsb = LSB_PER_G[rng]
-        counts = np.rint(a_clip * lsb).astype(np.int32)
-        counts = np.clip(counts, -32768, 32767).astype(np.int16)
-        return counts, a_clip.astype(float)
+        counts = np.multiply(a_clip, self._lsb)
+        np.rint(counts, out=counts)
+        np.minimum(counts, 32767, out=counts)
+        np.maximum(counts, -32768, out=counts)
+        return counts.astype(np.int16), a_clip.astype(float, copy=False)
 
 
     @classmethod
@@ -116,7 +259,8 @@ class AccelSim:
                     noise_density_g_sqrtHz: float, 
                     use_lpf: bool, 
                     lpf_cut_hz: float,
-                    seed: int | None = None) -> "AccelSim":
+                    seed: int | np.random.Generator | None = None,
+                    dtype: type = np.float64) -> "AccelSim":
         """Factory method to build an AccelSim from configuration parameters."""
         cfg = AccelSimConfig(
                 range_g=range_g,
@@ -125,5 +269,88 @@ class AccelSim:
                 noise_density_g_sqrtHz=float(noise_density_g_sqrtHz),
                 use_lpf=use_lpf,
                 lpf_cut_hz=float(lpf_cut_hz),
+                dtype=dtype,
             )
         return cls(cfg, seed=seed)
+
+
+class AccelSimEnsemble:
+    """
+    K independent accelerometers stepped together for Monte-Carlo runs.
+
+    Per-member state is stored structure-of-arrays, one (3, K) array per quantity, so every
+    pipeline stage is a single NumPy operation across the whole ensemble.
+    """
+
+    def __init__(self, cfgs: list[AccelSimConfig], seed: int | np.random.Generator | None = None) -> None:
+        self.cfgs = list(cfgs)
+        self.K    = len(self.cfgs)
+        if self.K == 0:
+            raise ValueError("AccelSimEnsemble needs at least one config")
+        self._rng = np.random.default_rng(seed)
+
+        # All members share one precision, like the internal state of a single AccelSim
+        dtypes = {np.dtype(cfg.dtype) for cfg in self.cfgs}
+        if len(dtypes) > 1:
+            raise ValueError("AccelSimEnsemble members must share the same dtype")
+        self._dtype = dtypes.pop()
+
+        alphas = [_lpf_alpha(cfg) for cfg in self.cfgs]
+
+        self.state  = np.zeros((3, self.K), dtype=self._dtype)
+        self._bias  = np.stack([np.asarray(cfg.bias_g, dtype=self._dtype) for cfg in self.cfgs], axis=1)
+        self._range = np.array([float(cfg.range_g) for cfg in self.cfgs], dtype=self._dtype)
+        self._lsb   = np.array([LSB_PER_G[cfg.range_g] for cfg in self.cfgs], dtype=self._dtype)
+        self._sigma = np.array([_noise_sigma(cfg, a) for cfg, a in zip(self.cfgs, alphas)],
+                               dtype=self._dtype)
+
+        # Members without LPF get alpha = 0, which makes y[n] = x[n]
+        self._alpha = np.array([a if a is not None else 0.0 for a in alphas], dtype=self._dtype)
+        self._one_minus_alpha = 1.0 - self._alpha
+
+        # All members are stepped together, so a single warm-start flag covers the ensemble
+        self._primed = False
+
+
+    def step_ensemble(self, a_lin_world_ms2: np.ndarray, R_world_to_sensor: np.ndarray
+                      ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Compute one sample for every ensemble member.
+
+        Args:
+            a_lin_world_ms2: (3, K) linear accelerations (m/s², excluding gravity) in world frame.
+            R_world_to_sensor: a single 3x3 rotation (world → sensor) or a (3, 3, K) stack.
+
+        Returns:
+            counts_int16[3, K]: quantized sensor counts.
+            a_meas_g[3, K]: simulated measurements in g.
+        """
+        A = np.asarray(a_lin_world_ms2, dtype=self._dtype).reshape(3, self.K)
+        R = np.asarray(R_world_to_sensor, dtype=self._dtype)
+
+        # Transform acceleration into sensor frame in g and add gravity (R[:, 2], in g)
+        if R.ndim == 2:
+            a_s = (R @ A) * INV_G_MS2 + R[:, 2, None]
+        else:
+            a_s = np.einsum("ijk,jk->ik", R, A) * INV_G_MS2 + R[:, 2, :]
+        a_biased = a_s + self._bias
+
+        # 1st-order LPF across the ensemble; the first sample primes the state
+        if self._primed:
+            self.state *= self._alpha
+            self.state += self._one_minus_alpha * a_biased
+        else:
+            self.state[:] = a_biased
+            self._primed = True
+
+        # Add white Gaussian noise and clip to each member's range
+        a_clip = self.state + self._sigma * self._rng.standard_normal((3, self.K), dtype=self._dtype)
+        np.minimum(a_clip, self._range, out=a_clip)
+        np.maximum(a_clip, -self._range, out=a_clip)
+
+        # Quantize to 16-bit integer counts
+        counts = np.multiply(a_clip, self._lsb)
+        np.rint(counts, out=counts)
+        np.minimum(counts, 32767, out=counts)
+        np.maximum(counts, -32768, out=counts)
+        return counts.astype(np.int16), a_clip.astype(float, copy=False)
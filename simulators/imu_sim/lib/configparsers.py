@@ -1,75 +1,151 @@
-import configparser
+import functools
+import re
 
 from pathlib import Path
 
 
+_BIAS_KEYS  = ("bias_x", "bias_y", "bias_z")
+_WORLD_KEYS = ("world_x", "world_y", "world_z")
+
+# Inline comments start at a ';' preceded by whitespace, as with inline_comment_prefixes=(';',)
+_INLINE_COMMENT = re.compile(r"\s;")
+
+
+@functools.lru_cache(maxsize=16)
+def _parse_ini(text: str) -> dict[str, dict[str, str]]:
+    """
+    Parse INI text into a plain {section: {key: value}} dict. Results are cached by content,
+    so re-reading an unchanged file skips parsing entirely. Callers must not mutate it.
+
+    Only the subset of INI used by the simulator configs is supported: '[section]' headers,
+    'key = value' (or 'key: value') lines, full-line '#'/';' comments and inline ';' comments.
+    Keys are lower-cased and values stripped, matching configparser's defaults. Features this
+    reader would silently misparse, such as indented continuation lines and '[DEFAULT]'
+    inheritance, raise ValueError instead.
+    """
+    sections: dict[str, dict[str, str]] = {}
+    current = None
+    for lineno, raw in enumerate(text.splitlines(), 1):
+        line = raw.strip()
+        if not line or line[0] in "#;":
+            continue
+        if raw[0].isspace():
+            raise ValueError(f"Indented line {lineno} is not supported (no continuation lines): {raw!r}")
+        if line[0] == "[":
+            if line[-1] != "]":
+                raise ValueError(f"Malformed section header on line {lineno}: {line!r}")
+            name = line[1:-1].strip()
+            if name == "DEFAULT":
+                raise ValueError(f"[DEFAULT] section on line {lineno} is not supported")
+            if name in sections:
+                raise ValueError(f"Duplicate section {name!r} on line {lineno}")
+            current = sections[name] = {}
+            continue
+        if current is None:
+            raise ValueError(f"Key outside of a section on line {lineno}: {line!r}")
+
+        # Split on the first '=' or ':' delimiter, whichever comes first
+        eq, colon = line.find("="), line.find(":")
+        sep = eq if colon < 0 or 0 <= eq < colon else colon
+        if sep <= 0:
+            raise ValueError(f"Expected 'key = value' on line {lineno}: {line!r}")
+        key = line[:sep].strip().lower()
+        if key in current:
+            raise ValueError(f"Duplicate key {key!r} on line {lineno}")
+        value = line[sep + 1:]
+        m = _INLINE_COMMENT.search(value)
+        if m is not None:
+            value = value[:m.start()]
+        current[key] = value.strip()
+    return sections
+
+
+def _read_ini(filename) -> dict[str, dict[str, str]]:
+    # Missing/unreadable files behave like an empty INI, as ConfigParser.read() did
+    try:
+        text = Path(filename).read_text(encoding="utf-8")
+    except OSError:
+        return {}
+    return _parse_ini(text)
+
+
 class IMUParser:
     def __init__(self, filename="config.ini"):
-        self.config = configparser.ConfigParser(inline_comment_prefixes=(';'))
-        self.config.read(Path(filename))
+        self.config = _read_ini(filename)
+
+    @classmethod
+    def from_string(cls, text: str) -> "IMUParser":
+        """Build a parser from INI text held in memory instead of a file."""
+        parser = cls.__new__(cls)
+        parser.config = _parse_ini(text)
+        return parser
+
+    def _get(self, section: str, key: str, conv, fallback):
+        raw = self.config[section].get(key)
+        return fallback if raw is None else conv(raw)
+
+    def _getint(self, section: str, key: str, fallback: int) -> int:
+        return self._get(section, key, int, fallback)
+
+    def _getfloat(self, section: str, key: str, fallback: float) -> float:
+        return self._get(section, key, float, fallback)
+
+    def _getfloats(self, section: str, keys: tuple[str, ...], fallbacks: tuple[float, ...]) -> list[float]:
+        # Look the section up once and convert all keys of a vector (bias/world triplets)
+        values = self.config[section]
+        return [fb if (raw := values.get(key)) is None else float(raw)
+                for key, fb in zip(keys, fallbacks)]
 
     # Accelerometer
     def parse_accel_range(self):
-        idx = self.config["accelerometer"].getint("range", fallback=1)
+        idx = self._getint("accelerometer", "range", fallback=1)
         return idx
 
     def parse_accel_dlpf(self):
-        idx = self.config["accelerometer"].getint("dlpf", fallback=1)
+        idx = self._getint("accelerometer", "dlpf", fallback=1)
         return idx
 
     def parse_accel_bias(self):
-        bx = self.config["accelerometer"].getfloat("bias_x", fallback=0.0)
-        by = self.config["accelerometer"].getfloat("bias_y", fallback=0.0)
-        bz = self.config["accelerometer"].getfloat("bias_z", fallback=0.0)
-        return [bx, by, bz]
+        return self._getfloats("accelerometer", _BIAS_KEYS, (0.0, 0.0, 0.0))
 
     def parse_accel_noise_density(self):
-        return self.config["accelerometer"].getfloat("noise_density", fallback=0.0003)
+        return self._getfloat("accelerometer", "noise_density", fallback=0.0003)
 
     def parse_accel_smplrt_div(self):
-        return self.config["accelerometer"].getint("sample_rate_div", fallback=0)
+        return self._getint("accelerometer", "sample_rate_div", fallback=0)
     
 
     # Gyroscope
     def parse_gyro_range(self):
-        idx = self.config["gyroscope"].getint("range", fallback=1)
+        idx = self._getint("gyroscope", "range", fallback=1)
         return idx
     
     def parse_gyro_dlpf(self):
-        idx = self.config["gyroscope"].getint("dlpf", fallback=1)
+        idx = self._getint("gyroscope", "dlpf", fallback=1)
         return idx
     
     def parse_gyro_bias(self):
-        bx = self.config["gyroscope"].getfloat("bias_x", fallback=0.0)
-        by = self.config["gyroscope"].getfloat("bias_y", fallback=0.0)
-        bz = self.config["gyroscope"].getfloat("bias_z", fallback=0.0)
-        return [bx, by, bz]
+        return self._getfloats("gyroscope", _BIAS_KEYS, (0.0, 0.0, 0.0))
 
     def parse_gyro_noise_density(self):
-        return self.config["gyroscope"].getfloat("noise_density", fallback=0.01)
+        return self._getfloat("gyroscope", "noise_density", fallback=0.01)
 
     def parse_gyro_smplrt_div(self):
-        return self.config["gyroscope"].getint("sample_rate_div", fallback=0)
+        return self._getint("gyroscope", "sample_rate_div", fallback=0)
     
 
     # Magnetometer
     def parse_mag_range(self) -> int:
-        return self.config["magnetometer"].getint("range", fallback=2)
+        return self._getint("magnetometer", "range", fallback=2)
     
     def parse_mag_mode(self) -> int:
-        return self.config["magnetometer"].getint("mode", fallback=3)
+        return self._getint("magnetometer", "mode", fallback=3)
     
     def parse_mag_bias(self) -> list[float]:
-        m = self.config["magnetometer"]
-        return [m.getfloat("bias_x", fallback=0.0),
-                m.getfloat("bias_y", fallback=0.0),
-                m.getfloat("bias_z", fallback=0.0)]
+        return self._getfloats("magnetometer", _BIAS_KEYS, (0.0, 0.0, 0.0))
 
     def parse_mag_noise_density(self) -> float:
-        return self.config["magnetometer"].getfloat("noise_density", fallback=0.4)
+        return self._getfloat("magnetometer", "noise_density", fallback=0.4)
 
     def parse_mag_world(self) -> list[float]:
-        m = self.config["magnetometer"]
-        return [m.getfloat("world_x", fallback=20.0),
-                m.getfloat("world_y", fallback=0.0),
-                m.getfloat("world_z", fallback=40.0)]
\ No newline at end of file
+        return self._getfloats("magnetometer", _WORLD_KEYS, (20.0, 0.0, 40.0))
\ No newline at end of file
@@ -1,6 +1,13 @@
 from enum import Enum
 
 
+# Physical values indexed by enum value (index 0 is unused)
+_ACCEL_G   = (None, 2, 4, 8, 16)
+_GYRO_DPS  = (None, 250, 500, 1000, 2000)
+_MAG_BITS  = (None, 14, 16)
+_MAG_HZ    = (None, 0.0, 0.0, 8.0, 100.0)
+
+
 class AccelerometerRange(Enum):
     ACCEL_RANGE_2G  = 1
     ACCEL_RANGE_4G  = 2
@@ -8,7 +15,7 @@ class AccelerometerRange(Enum):
     ACCEL_RANGE_16G = 4
 
     def to_g(self) -> int:
-        return {1: 2, 2: 4, 3: 8, 4: 16}[self.value]
+        return _ACCEL_G[self.value]
     
 
 class GyroscopeRange(Enum):
@@ -18,7 +25,7 @@ class GyroscopeRange(Enum):
     GYRO_RANGE_2000DPS = 4
 
     def to_dps(self) -> int:
-        return {1: 250, 2: 500, 3: 1000, 4: 2000}[self.value]
+        return _GYRO_DPS[self.value]
 
 
 class MagnetometerRange(Enum):
@@ -26,7 +33,7 @@ class MagnetometerRange(Enum):
     MAG_RANGE_16BITS = 2
 
     def to_bits(self) -> int:
-        return {1: 14, 2: 16}[self.value]
+        return _MAG_BITS[self.value]
 
 
 class MagnetometerMode(Enum):
@@ -36,7 +43,7 @@ class MagnetometerMode(Enum):
     CONT_100HZ = 4
 
     def to_hz(self) -> int:
-        return {1:0.0, 2:0.0, 3:8.0, 4:100.0}[self.value]
+        return _MAG_HZ[self.value]
 
 
 class DLPF(Enum):
@@ -0,0 +1,41 @@
+"""
+Batch form of the first-order low-pass filter shared by the sensor simulators.
+"""
+
+import numpy as np
+
+from scipy.signal import sosfilt
+
+
+def lpf_sos(alpha: float, dtype: type = np.float64) -> np.ndarray:
+    """
+    Express y[n] = α*y[n-1] + (1-α)*x[n] as a single second-order section for sosfilt.
+    """
+    return np.array([[1.0 - alpha, 0.0, 0.0, 1.0, -alpha, 0.0]], dtype=dtype)
+
+
+def lpf_series(sos: np.ndarray | None, state: np.ndarray, primed: bool, x: np.ndarray) -> np.ndarray:
+    """
+    Run the LPF described by 'sos' (see lpf_sos) over an (N, 3) series of consecutive inputs
+    in one compiled IIR sweep.
+
+    The filter continues from 'state', which is updated in place to the last output. When
+    not 'primed', the first output equals the first input. The result equals N successive
+    per-sample updates. With 'sos' None (LPF disabled) or no rows, 'x' is returned.
+    """
+    n = x.shape[0]
+    if sos is None or n == 0:
+        return x
+    y = np.empty_like(x)
+    start = 0
+    if not primed:
+        y[0] = x[0]
+        state[:] = x[0]
+        start = 1
+    if start < n:
+        # sosfilt's first delay element holds α*y[n-1] for this section (α = -a1)
+        zi = np.zeros((1, 2, x.shape[1]), dtype=x.dtype)
+        zi[0, 0] = -sos[0, 4] * state
+        y[start:], _ = sosfilt(sos, x[start:], axis=0, zi=zi)
+    state[:] = y[-1]
+    return y
@@ -2,11 +2,15 @@ from dataclasses import dataclass
 import math
 import numpy as np
 
+from simulators.imu_sim.lib.filters import lpf_series, lpf_sos
+from simulators.imu_sim.lib.jit import HAVE_NUMBA, njit
+from simulators.imu_sim.lib.noise import NoisePool
+
 
 LSB_PER_DPS = {250: 131.0, 500: 65.5, 1000: 32.8, 2000: 16.4}
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class GyroSimConfig:
     range_dps: int
     odr_hz: float
@@ -14,20 +18,112 @@ class GyroSimConfig:
     noise_density_dps_sqrtHz: float
     use_lpf: bool
     lpf_cut_hz: float
+    dtype: type = np.float64    # internal state/noise precision (np.float32 halves memory traffic)
+
+
+@njit(cache=True)
+def _gyro_step_kernel(omega_world, R, bias, state, use_lpf, primed, alpha, one_minus_alpha,
+                      sigma, noise, range_dps, lsb, counts_out, meas_out):
+    """
+    Scalar gyroscope pipeline: rotate, add bias, LPF, noise, clip and quantize.
+    'state' is updated in place; results are written into 'counts_out' and 'meas_out'.
+    """
+    w0 = omega_world[0]; w1 = omega_world[1]; w2 = omega_world[2]
+    for i in range(3):
+        # Transform angular velocity into sensor frame (unrolled 3x3 matvec) and apply bias
+        omega_biased = R[i, 0] * w0 + R[i, 1] * w1 + R[i, 2] * w2 + bias[i]
+
+        # Optional LPF
+        if use_lpf:
+            if not primed:
+                state[i] = omega_biased
+            else:
+                state[i] = alpha * state[i] + one_minus_alpha * omega_biased
+            w_f = state[i]
+        else:
+            w_f = omega_biased
+
+        # Add white Gaussian noise and clip to sensor range
+        w_clip = w_f + sigma * noise[i]
+        if w_clip < -range_dps:
+            w_clip = -range_dps
+        elif w_clip > range_dps:
+            w_clip = range_dps
+        meas_out[i] = w_clip
+
+        # Quantize to 16-bit integer counts
+        c = round(w_clip * lsb)
+        if c < -32768:
+            c = -32768
+        elif c > 32767:
+            c = 32767
+        counts_out[i] = c
+
+
+@njit(cache=True)
+def _gyro_batch_kernel(omega_world, R, bias, state, use_lpf, primed, alpha, one_minus_alpha,
+                       sigma, noise, range_dps, lsb, counts_out, meas_out):
+    """
+    Same pipeline as _gyro_step_kernel over N rows in one compiled loop ('R' is (N, 3, 3)).
+    """
+    for n in range(omega_world.shape[0]):
+        w0 = omega_world[n, 0]; w1 = omega_world[n, 1]; w2 = omega_world[n, 2]
+        for i in range(3):
+            omega_biased = R[n, i, 0] * w0 + R[n, i, 1] * w1 + R[n, i, 2] * w2 + bias[i]
+
+            if use_lpf:
+                if not primed:
+                    state[i] = omega_biased
+                else:
+                    state[i] = alpha * state[i] + one_minus_alpha * omega_biased
+                w_f = state[i]
+            else:
+                w_f = omega_biased
+
+            w_clip = w_f + sigma * noise[n, i]
+            if w_clip < -range_dps:
+                w_clip = -range_dps
+            elif w_clip > range_dps:
+                w_clip = range_dps
+            meas_out[n, i] = w_clip
+
+            c = round(w_clip * lsb)
+            if c < -32768:
+                c = -32768
+            elif c > 32767:
+                c = 32767
+            counts_out[n, i] = c
+        primed = True
 
 
 class GyroSim:
-    def __init__(self, cfg: GyroSimConfig, seed: int | None = None) -> None:
+    ready = True
+
+    def __init__(self, cfg: GyroSimConfig, seed: int | np.random.Generator | None = None) -> None:
         self.cfg   = cfg
-        self.state = np.zeros(3, dtype=float)
+        self._dtype = np.dtype(cfg.dtype)
+        self.state = np.zeros(3, dtype=self._dtype)
         self._rng  = np.random.default_rng(seed)
 
+        self._bias  = np.asarray(cfg.bias_dps, dtype=self._dtype)
+        self._range = float(cfg.range_dps)
+        self._lsb   = LSB_PER_DPS[int(cfg.range_dps)]
+
+        self._noise = NoisePool(self._rng, self._dtype)
+
         # Compute LPF coefficient (1st-order). If cutoff <= 0, LPF is disabled.
         if self.cfg.use_lpf and self.cfg.lpf_cut_hz > 0.0:
             dt = 1.0 / self.cfg.odr_hz
             self._alpha = math.exp(-2.0 * math.pi * self.cfg.lpf_cut_hz * dt)
         else:
             self._alpha = None
+        self._one_minus_alpha = (1.0 - self._alpha) if self._alpha is not None else None
+
+        self._use_lpf = self._alpha is not None
+        self._k_alpha = self._alpha if self._use_lpf else 0.0
+        self._k_one_minus_alpha = self._one_minus_alpha if self._use_lpf else 0.0
+
+        self._sos = lpf_sos(self._alpha, self._dtype) if self._use_lpf else None
 
         # Warm-start flag: first output equals the first input
         self._primed = (self._alpha is None)
@@ -49,11 +145,15 @@ class GyroSim:
         return self.cfg.noise_density_dps_sqrtHz * math.sqrt(bw_eq)
 
 
-    def ready(self, dt: float) -> bool:
-        return True
+    def filter_series(self, x: np.ndarray) -> np.ndarray:
+        """Run the LPF over an (N, 3) series of consecutive inputs, continuing from the current state."""
+        y = lpf_series(self._sos, self.state, self._primed, x)
+        self._primed = self._primed or x.shape[0] > 0
+        return y
 
 
-    def step(self, omega_world_dps: np.ndarray, R_world_to_sensor: np.ndarray
+    def step(self, omega_world_dps: np.ndarray, R_world_to_sensor: np.ndarray,
+             counts_out: np.ndarray | None = None, meas_out: np.ndarray | None = None
              ) -> tuple[np.ndarray, np.ndarray]:
         """
         Compute one gyroscope sample.
@@ -61,42 +161,75 @@ class GyroSim:
         Args:
             omega_world_dps: angular velocity (°/s) in world frame.
             R_world_to_sensor: 3x3 rotation matrix (world → sensor).
+            counts_out: optional int16[3] buffer to write the counts into (e.g. a row of a
+                        preallocated output array). A new array is allocated when None.
+            meas_out: optional float64[3] buffer to write the measurement into.
 
         Returns:
             counts_int16[3]: quantized sensor counts.
             omega_meas_dps[3]: simulated measurement in °/s.
         """
-        # Transform angular velocity into sensor frame
-        omega_s = R_world_to_sensor @ omega_world_dps
+        counts = np.empty(3, dtype=np.int16) if counts_out is None else counts_out
+        w_meas = np.empty(3, dtype=float) if meas_out is None else meas_out
+        _gyro_step_kernel(omega_world_dps, R_world_to_sensor, self._bias, self.state,
+                          self._use_lpf, self._primed, self._k_alpha, self._k_one_minus_alpha,
+                          self._sigma, self._noise.next(),
+                          self._range, self._lsb, counts, w_meas)
+        self._primed = True
+        return counts, w_meas
+
+
+    def step_batch(self, omega_world_dps: np.ndarray, R_world_to_sensor: np.ndarray
+                   ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Compute N consecutive gyroscope samples at once.
 
-        # Apply static bias
-        omega_biased = omega_s + self.cfg.bias_dps
+        Args:
+            omega_world_dps: (N, 3) angular velocities (°/s) in world frame.
+            R_world_to_sensor: a single 3x3 rotation (world → sensor) or an (N, 3, 3) stack.
 
-        # Apply optional LPF
-        if self._alpha is not None:
-            if not self._primed:
-                self.state[:] = omega_biased
-                self._primed = True
-            else:
-                self.state = self._alpha * self.state + (1.0 - self._alpha) * omega_biased
-            w_f = self.state
-        else:
-            w_f = omega_biased
+        Returns:
+            counts_int16[N, 3]: quantized sensor counts.
+            omega_meas_dps[N, 3]: simulated measurements in °/s.
+
+        The LPF state is shared with step(), so batches and single steps can be interleaved.
+        For float64 the result equals N step() calls. For float32, inputs and the NumPy path
+        are single precision while step() computes in double, so results agree only to float32
+        tolerance and counts may differ by 1 LSB at rounding boundaries.
+        """
+        w = np.asarray(omega_world_dps, dtype=self._dtype).reshape(-1, 3)
+        R = np.asarray(R_world_to_sensor, dtype=self._dtype)
+        n = w.shape[0]
+
+        if HAVE_NUMBA:
+            counts = np.empty((n, 3), dtype=np.int16)
+            w_meas = np.empty((n, 3), dtype=float)
+            _gyro_batch_kernel(w, np.broadcast_to(R, (n, 3, 3)), self._bias, self.state,
+                               self._use_lpf, self._primed, self._k_alpha, self._k_one_minus_alpha,
+                               self._sigma, self._noise.take(n),
+                               self._range, self._lsb, counts, w_meas)
+            self._primed = self._primed or n > 0
+            return counts, w_meas
+
+        # Transform angular velocity into sensor frame and apply bias
+        w_s = w[:, 0:1] * R[..., 0] + w[:, 1:2] * R[..., 1] + w[:, 2:3] * R[..., 2]
+        w_biased = w_s + self._bias
 
-        # Add white Gaussian noise
-        noise = self._rng.normal(0.0, self._sigma, size=3)
-        w_noisy = w_f + noise
+        # Apply optional LPF
+        w_f = self.filter_series(w_biased)
 
-        # Clip to sensor range
-        rng = int(self.cfg.range_dps)
-        w_clip = np.clip(w_noisy, -rng, +rng)
+        # Add white Gaussian noise and clip to sensor range
+        rng = self._range
+        w_clip = w_f + self._sigma * self._noise.take(n)
+        np.minimum(w_clip, rng, out=w_clip)
+        np.maximum(w_clip, -rng, out=w_clip)
 
         # Quantize to 16-bit integer counts
-        lsb = LSB_PER_DPS[rng]
-        counts = np.rint(w_clip * lsb).astype(np.int32)
-        counts = np.clip(counts, -32768, 32767).astype(np.int16)
-
-        return counts, w_clip.astype(float)
+        counts = np.multiply(w_clip, self._lsb)
+        np.rint(counts, out=counts)
+        np.minimum(counts, 32767, out=counts)
+        np.maximum(counts, -32768, out=counts)
+        return counts.astype(np.int16), w_clip.astype(float, copy=False)
 
 
     @classmethod
@@ -107,7 +240,8 @@ class GyroSim:
                     noise_density_dps_sqrtHz: float, 
                     use_lpf: bool, 
                     lpf_cut_hz: float,
-                    seed: int | None = None) -> "GyroSim":
+                    seed: int | np.random.Generator | None = None,
+                    dtype: type = np.float64) -> "GyroSim":
         """Factory method to build a GyroSim from configuration parameters."""
         cfg = GyroSimConfig(
             range_dps=int(range_dps),
@@ -116,5 +250,6 @@ class GyroSim:
             noise_density_dps_sqrtHz=float(noise_density_dps_sqrtHz),
             use_lpf=bool(use_lpf),
             lpf_cut_hz=float(lpf_cut_hz),
+            dtype=dtype,
         )
         return cls(cfg, seed=seed)
@@ -1,6 +1,6 @@
 import numpy as np
 
-from typing import Callable, Dict, Any, List, Tuple
+from typing import Callable, Dict, Any, List, Optional, Tuple
 
 from simulators.imu_sim.lib.configparsers import IMUParser
 from simulators.imu_sim.lib.accelerometer_sim import AccelSim
@@ -10,9 +10,43 @@ from simulators.imu_sim.lib.enums import (AccelerometerRange, GyroscopeRange, Ma
                                           MagnetometerMode, DLPF)
 
 
+# Sensor timestamps closer than this are sampled in the same simulation event
+EVENT_EPS = 1e-12
+
 MotionProvider = Callable[[float], Tuple[np.ndarray, np.ndarray, np.ndarray]]
 # returns: (a_lin_world_ms2[3], omega_world_dps[3], R_world_to_sensor 3x3)
 
+BatchedMotionProvider = Callable[[np.ndarray], Tuple[np.ndarray, np.ndarray, np.ndarray]]
+# takes t[N]; returns: (a_lin_world_ms2[N, 3], omega_world_dps[N, 3], R_world_to_sensor[N, 3, 3])
+
+
+def make_imu_rngs(seed: int | None = None
+                  ) -> Tuple[np.random.Generator, np.random.Generator, np.random.Generator]:
+    """
+    Build (accel_rng, gyro_rng, mag_rng) from a single seed. The streams are spawned from one
+    SeedSequence, so they are statistically independent and reproducible as a group.
+    """
+    children = np.random.SeedSequence(seed).spawn(3)
+    accel_rng, gyro_rng, mag_rng = (np.random.default_rng(s) for s in children)
+    return accel_rng, gyro_rng, mag_rng
+
+
+def _to_enum(enum_cls, val, what: str):
+    """
+    Coerce a setter value to a member of 'enum_cls'. Members pass through unchanged and ints are
+    looked up by value; anything else is a TypeError and unknown ints are a ValueError.
+    """
+    if type(val) is enum_cls:
+        return val
+    if not isinstance(val, int):
+        raise TypeError(f"Invalid type {type(val)}. "
+                        f"Valid types are int, {enum_cls.__name__}")
+    try:
+        return enum_cls(val)
+    except ValueError:
+        raise ValueError(f"Invalid {what} {val}. "
+                         f"Valid values are {[e.value for e in enum_cls]}.")
+
 
 class MPU9250:
 
@@ -39,6 +73,11 @@ class MPU9250:
         self._mag_noise_density = None
         self._mag_world = None 
 
+        # Sensor simulators, created by init_*_sim()
+        self._accel_sim = None
+        self._gyro_sim  = None
+        self._mag_sim   = None
+
 
     @property
     def accel_range(self) -> AccelerometerRange:
@@ -46,17 +85,7 @@ class MPU9250:
 
     @accel_range.setter
     def accel_range(self, val: int | AccelerometerRange) -> None:
-        if isinstance(val, int):
-            try:
-                self._accel_range = AccelerometerRange(val)
-            except ValueError:
-                raise ValueError(f"Invalid accelerometer range {val}. "
-                                 f"Valid values are {[e.value for e in AccelerometerRange]}.")
-        elif isinstance(val, AccelerometerRange):
-            self._accel_range = val
-        else:
-            raise TypeError(f"Invalid type {type(val)}. "
-                            f"Valid types are int, AccelerometerRange")
+        self._accel_range = _to_enum(AccelerometerRange, val, "accelerometer range")
 
     @property
     def accel_dlpf(self) -> DLPF:
@@ -64,17 +93,7 @@ class MPU9250:
 
     @accel_dlpf.setter
     def accel_dlpf(self, val: int | DLPF) -> None:
-        if isinstance(val, int):
-            try:
-                self._accel_dlpf = DLPF(val)
-            except ValueError:
-                raise ValueError(f"Invalid accelerometer DLPF value {val}. "
-                                 f"Valid values are {[e.value for e in DLPF]}.")
-        elif isinstance(val, DLPF):
-            self._accel_dlpf = val
-        else:
-            raise TypeError(f"Invalid type {type(val)}. "
-                            f"Valid types are int, DLPF")
+        self._accel_dlpf = _to_enum(DLPF, val, "accelerometer DLPF value")
 
     @property
     def accel_bias(self) -> list[float]:
@@ -128,17 +147,7 @@ class MPU9250:
 
     @gyro_range.setter
     def gyro_range(self, val: int | GyroscopeRange) -> None:
-        if isinstance(val, int):
-            try:
-                self._gyro_range = GyroscopeRange(val)
-            except ValueError:
-                raise ValueError(f"Invalid gyroscope range {val}. "
-                                 f"Valid values are {[e.value for e in GyroscopeRange]}.")
-        elif isinstance(val, GyroscopeRange):
-            self._gyro_range = val
-        else:
-            raise TypeError(f"Invalid type {type(val)}. "
-                            f"Valid types are int, GyroscopeRange")
+        self._gyro_range = _to_enum(GyroscopeRange, val, "gyroscope range")
     
     @property
     def gyro_dlpf(self) -> DLPF:
@@ -146,17 +155,7 @@ class MPU9250:
 
     @gyro_dlpf.setter
     def gyro_dlpf(self, val: int | DLPF) -> None:
-        if isinstance(val, int):
-            try:
-                self._gyro_dlpf = DLPF(val)
-            except ValueError:
-                raise ValueError(f"Invalid gyroscope DLPF value {val}. "
-                                 f"Valid values are {[e.value for e in DLPF]}.")
-        elif isinstance(val, DLPF):
-            self._gyro_dlpf = val
-        else:
-            raise TypeError(f"Invalid type {type(val)}. "
-                            f"Valid types are int, DLPF")
+        self._gyro_dlpf = _to_enum(DLPF, val, "gyroscope DLPF value")
     
     @property
     def gyro_bias(self) -> list[float]:
@@ -207,17 +206,7 @@ class MPU9250:
 
     @mag_range.setter
     def mag_range(self, val: int | MagnetometerRange) -> None:
-        if isinstance(val, int):
-            try:
-                self._mag_range = MagnetometerRange(val)
-            except ValueError:
-                raise ValueError(f"Invalid magnetometer range {val}. "
-                                 f"Valid values are {[e.value for e in MagnetometerRange]}.")
-        elif isinstance(val, MagnetometerRange):
-            self._mag_range = val
-        else:
-            raise TypeError(f"Invalid type {type(val)}. "
-                            f"Valid types are int, MagnetometerRange")
+        self._mag_range = _to_enum(MagnetometerRange, val, "magnetometer range")
     
     @property
     def mag_mode(self) -> MagnetometerMode:
@@ -225,18 +214,8 @@ class MPU9250:
 
     @mag_mode.setter
     def mag_mode(self, val: int | MagnetometerMode) -> None:
-        if isinstance(val, int):
-            try:
-                self._mag_mode = MagnetometerMode(val)
-            except ValueError:
-                raise ValueError(f"Invalid magnetometer mode {val}. "
-                                f"Valid values are {[e.value for e in MagnetometerMode]}.")
-        elif isinstance(val, MagnetometerMode):
-            self._mag_mode = val
-        else:
-            raise TypeError("mag_mode must be int or MagnetometerMode")
-
-        self._mag_odr = self.mag_mode.to_hz()
+        self._mag_mode = _to_enum(MagnetometerMode, val, "magnetometer mode")
+        self._mag_odr = self._mag_mode.to_hz()
     
     @property
     def mag_bias(self) -> list[float]:
@@ -277,7 +256,17 @@ class MPU9250:
             
 
     def read_config(self):
-        parser = IMUParser(self.config_file)
+        self._apply_config(IMUParser(self.config_file))
+
+
+    def read_config_from_string(self, text: str):
+        """
+        Same as read_config(), but parses INI text held in memory (no file is read).
+        """
+        self._apply_config(IMUParser.from_string(text))
+
+
+    def _apply_config(self, parser: IMUParser):
         self.accel_range = parser.parse_accel_range()
         self.accel_dlpf  = parser.parse_accel_dlpf()
         self.accel_bias  = parser.parse_accel_bias()
@@ -297,7 +286,8 @@ class MPU9250:
         self.mag_world = parser.parse_mag_world()
     
 
-    def init_accel_sim(self, seed: int | None = None, lpf_cut_hz: float = 100.0):
+    def init_accel_sim(self, seed: int | np.random.Generator | None = None, lpf_cut_hz: float = 100.0,
+                       dtype: type = np.float64):
         range_g = self.accel_range.to_g()
         odr = float(self._accel_odr)
 
@@ -309,6 +299,7 @@ class MPU9250:
             use_lpf=(self._accel_dlpf == DLPF.ACTIVE),
             lpf_cut_hz=float(lpf_cut_hz),
             seed=seed,
+            dtype=dtype,
         )
 
 
@@ -318,12 +309,27 @@ class MPU9250:
         - a_lin_world_ms2: linear acceleration (WITHOUT gravity) in m/s² in world frame.
         - R_world_to_sensor: 3x3 rotation matrix that transforms world -> sensor coordinates.
         """
-        if not hasattr(self, "_accel_sim"):
+        if self._accel_sim is None:
             raise RuntimeError("Call init_accel_sim() before sample_accel()")
         return self._accel_sim.step(a_lin_world_ms2, R_world_to_sensor)
 
 
-    def init_gyro_sim(self, seed: int | None = None, lpf_cut_hz: float = 98.0):
+    def sample_accel_batch(self, a_lin_world_ms2: np.ndarray, R_world_to_sensor: np.ndarray):
+        """
+        Returns (counts_int16[N,3], a_g_float[N,3]) for N consecutive samples, equal to N calls
+        of sample_accel() (LPF state and noise stream continue across calls). With
+        init_accel_sim(dtype=np.float32) the batch runs in single precision, so it matches
+        sample_accel() only to float32 tolerance and counts may differ by 1 LSB.
+        - a_lin_world_ms2: (N,3) linear accelerations (WITHOUT gravity) in m/s² in world frame.
+        - R_world_to_sensor: a single 3x3 rotation or an (N,3,3) stack, world -> sensor.
+        """
+        if self._accel_sim is None:
+            raise RuntimeError("Call init_accel_sim() before sample_accel_batch()")
+        return self._accel_sim.step_batch(a_lin_world_ms2, R_world_to_sensor)
+
+
+    def init_gyro_sim(self, seed: int | np.random.Generator | None = None, lpf_cut_hz: float = 98.0,
+                      dtype: type = np.float64):
         if self._gyro_odr is None:
             raise RuntimeError("Gyro ODR not set. Configure gyro_dlpf and gyro_smplrt_div first.")
 
@@ -338,6 +344,7 @@ class MPU9250:
             use_lpf=(self._gyro_dlpf == DLPF.ACTIVE),
             lpf_cut_hz=float(lpf_cut_hz),
             seed=seed,
+            dtype=dtype,
         )
 
 
@@ -348,12 +355,26 @@ class MPU9250:
         - omega_world_dps: angular velocity in world frame (°/s), shape (3,)
         - R_world_to_sensor: rotation matrix world -> sensor, shape (3,3)
         """
-        if not hasattr(self, "_gyro_sim"):
+        if self._gyro_sim is None:
             raise RuntimeError("Call init_gyro_sim() before sample_gyro()")
         return self._gyro_sim.step(omega_world_dps, R_world_to_sensor)
 
 
-    def init_mag_sim(self, seed: int | None = None, lpf_cut_hz: float = 10.0):
+    def sample_gyro_batch(self, omega_world_dps: np.ndarray, R_world_to_sensor: np.ndarray):
+        """
+        Return N consecutive gyroscope samples as (counts_int16[N,3], omega_dps_float[N,3]),
+        equal to N calls of sample_gyro(). With init_gyro_sim(dtype=np.float32) the batch runs
+        in single precision, so it matches only to float32 tolerance (counts within 1 LSB).
+        Args:
+        - omega_world_dps: angular velocities in world frame (°/s), shape (N,3)
+        - R_world_to_sensor: rotation world -> sensor, shape (3,3) or (N,3,3)
+        """
+        if self._gyro_sim is None:
+            raise RuntimeError("Call init_gyro_sim() before sample_gyro_batch()")
+        return self._gyro_sim.step_batch(omega_world_dps, R_world_to_sensor)
+
+
+    def init_mag_sim(self, seed: int | np.random.Generator | None = None, lpf_cut_hz: float = 10.0):
         """
         Initialize magnetometer simulator (MagSim) from current configuration.
 
@@ -405,18 +426,41 @@ class MPU9250:
         Raises:
             RuntimeError: if init_mag_sim() has not been called.
         """
-        if not hasattr(self, "_mag_sim"):
+        if self._mag_sim is None:
             raise RuntimeError("Call init_mag_sim() before sample_mag()")
         return self._mag_sim.step(R_world_to_sensor)
 
 
-    def init_all_sims(self, accel_seed: int | None = None, gyro_seed:  int | None = None, 
-                      mag_seed: int | None = None, accel_lpf_cut_hz: float = 100.0, 
-                      gyro_lpf_cut_hz:  float = 98.0) -> None:
+    def sample_mag_batch(self, R_world_to_sensor: np.ndarray):
+        """
+        Return N consecutive magnetometer samples as (counts_int16[N,3], B_uT_float[N,3]),
+        equal to N calls of sample_mag().
+
+        Args:
+            R_world_to_sensor: (N,3,3) stack of rotation matrices world -> sensor.
+
+        Raises:
+            RuntimeError: if init_mag_sim() has not been called.
+        """
+        if self._mag_sim is None:
+            raise RuntimeError("Call init_mag_sim() before sample_mag_batch()")
+        return self._mag_sim.step_batch(R_world_to_sensor)
+
+
+    def init_all_sims(self, accel_seed: int | np.random.Generator | None = None,
+                      gyro_seed:  int | np.random.Generator | None = None,
+                      mag_seed: int | np.random.Generator | None = None, accel_lpf_cut_hz: float = 100.0,
+                      gyro_lpf_cut_hz:  float = 98.0, seed: int | None = None) -> None:
         """
         Initialize all enabled sensor simulators from current configuration.
         Must call read_config() before this.
+
+        If 'seed' is given, the per-sensor seeds are ignored and the three noise streams are
+        spawned from it with make_imu_rngs().
         """
+        if seed is not None:
+            accel_seed, gyro_seed, mag_seed = make_imu_rngs(seed)
+
         self.init_accel_sim(seed=accel_seed, lpf_cut_hz=accel_lpf_cut_hz)
         self.init_gyro_sim(seed=gyro_seed, lpf_cut_hz=gyro_lpf_cut_hz)
         # Mag ODR is driven by self.mag_mode; no LPF here for simplicity.
@@ -434,9 +478,69 @@ class MPU9250:
         self._t_next_mag  = 0.0 if self._dt_mag is not None else None
     
 
-    def simulate(self, duration_s: float, motion_provider: MotionProvider) -> Dict[str, Dict[str, Any]]:
+    def _schedule(self, t_end: float) -> Tuple[np.ndarray, List[np.ndarray]]:
         """
-        Run a multi-sensor simulation for 'duration_s', driven by 'motion_provider'.
+        Build the merged event grid of all sensor streams up to 't_end'.
+
+        Each stream's timestamps are accumulated exactly as repeated 't_next += dt' would be, then
+        merged on one sorted time axis; timestamps within EVENT_EPS of an event's earliest time
+        belong to that event. Returns the event times and, for accel/gyro/mag, the indices of the
+        events at which each stream is sampled. Next-sample times and self._t are advanced.
+        """
+        streams = [("_t_next_acc", self._dt_acc), ("_t_next_gyro", self._dt_gyro)]
+        if self._t_next_mag is not None:
+            streams.append(("_t_next_mag", self._dt_mag))
+
+        grids = []
+        for attr, dt in streams:
+            t_next = getattr(self, attr)
+            n = max(int((t_end + EVENT_EPS - t_next) / dt) + 2, 1)
+            grids.append(np.add.accumulate(np.r_[t_next, np.full(n, dt)]))
+
+        # Merge the candidate timestamps of all streams on a single time axis
+        cand  = [g[g <= t_end + EVENT_EPS] for g in grids]
+        times = np.concatenate(cand)
+        label = np.repeat(np.arange(len(cand)), [c.size for c in cand])
+        order = np.argsort(times, kind="stable")
+        times, label = times[order], label[order]
+
+        # A new event starts wherever the gap to the previous timestamp exceeds the tolerance.
+        # A chain of close timestamps may still span more than EVENT_EPS, so split it again at
+        # the first timestamp past each event's earliest time (chains hold at most one
+        # timestamp per stream, so this loop runs at most once per stream)
+        start = np.ones(times.size, dtype=bool)
+        start[1:] = np.diff(times) > EVENT_EPS
+        while True:
+            event = np.cumsum(start) - 1
+            late  = np.flatnonzero(times - times[start][event] > EVENT_EPS)
+            if late.size == 0:
+                break
+            first_late = np.ones(late.size, dtype=bool)
+            first_late[1:] = event[late[1:]] != event[late[:-1]]
+            start[late[first_late]] = True
+
+        # Events starting after t_end are never reached
+        ev_t  = times[start]
+        ev_t  = ev_t[:np.searchsorted(ev_t, t_end, side="right")]
+        keep  = event < ev_t.size
+
+        indices = []
+        for s, (attr, _) in enumerate(streams):
+            idx = event[keep & (label == s)]
+            indices.append(idx)
+            setattr(self, attr, float(grids[s][idx.size]))
+        if len(indices) < 3:
+            indices.append(np.zeros(0, dtype=np.intp))
+        if ev_t.size:
+            self._t = float(ev_t[-1])
+        return ev_t, indices
+
+
+    def simulate(self, duration_s: float, motion_provider: Optional[MotionProvider] = None
+                 ) -> Dict[str, Dict[str, Any]]:
+        """
+        Run a multi-sensor simulation for 'duration_s', driven by 'motion_provider'. Without a
+        motion provider the IMU is at rest and level (zero motion, identity attitude).
 
         Returns a dict with per-sensor arrays:
         {
@@ -447,54 +551,59 @@ class MPU9250:
         """
         t_end = self._t + float(duration_s)
 
-        acc_t:  List[float] = []; acc_c: List[np.ndarray] = []; acc_f: List[np.ndarray] = []
-        gyr_t:  List[float] = []; gyr_c: List[np.ndarray] = []; gyr_f: List[np.ndarray] = []
-        mag_t:  List[float] = []; mag_c: List[np.ndarray] = []; mag_f: List[np.ndarray] = []
+        ev_t, indices = self._schedule(t_end)
 
-        # Event-driven loop: always jump to the next sensor timestamp
-        while True:
-            candidates = [self._t_next_acc, self._t_next_gyro]
-            if self._t_next_mag is not None:
-                candidates.append(self._t_next_mag)
-            t_next = min(candidates)
+        # Query motion once per event, in time order, and stack into (N, 3) / (N, 3, 3) arrays.
+        # Streams with commensurate ODRs share events, so motion is never evaluated twice.
+        n_ev = ev_t.size
+        if motion_provider is None:
+            a_lin = omega = np.zeros((n_ev, 3))
+            R = np.broadcast_to(np.eye(3), (n_ev, 3, 3))
+        else:
+            a_lin = np.empty((n_ev, 3)); omega = np.empty((n_ev, 3)); R = np.empty((n_ev, 3, 3))
+            for k, t in enumerate(ev_t.tolist()):
+                a_lin[k], omega[k], R[k] = motion_provider(t)
 
-            if t_next > t_end:
-                break
+        return self._run_events(ev_t, indices, a_lin, omega, R)
 
-            self._t = t_next
 
-            # Query motion at current time
-            a_lin_world_ms2, omega_world_dps, R_world_to_sensor = motion_provider(self._t)
+    def simulate_batched(self, duration_s: float, motion_provider_batched: BatchedMotionProvider
+                         ) -> Dict[str, Dict[str, Any]]:
+        """
+        Same as simulate(), but 'motion_provider_batched' is called once with the array of all
+        event times and returns the whole motion history as (N, 3), (N, 3) and (N, 3, 3) arrays.
+        Use it when the motion model can be evaluated vectorized.
+        """
+        t_end = self._t + float(duration_s)
 
-            # Sample sensors whose time has arrived (allow tiny epsilon)
-            EPS = 1e-12
+        ev_t, indices = self._schedule(t_end)
 
-            if abs(self._t - self._t_next_acc) <= EPS:
-                cnt, meas = self.sample_accel(a_lin_world_ms2, R_world_to_sensor)
-                acc_t.append(self._t); acc_c.append(cnt); acc_f.append(meas)
-                self._t_next_acc += self._dt_acc
+        n_ev = ev_t.size
+        a_lin, omega, R = motion_provider_batched(ev_t)
+        a_lin = np.broadcast_to(np.asarray(a_lin, dtype=float), (n_ev, 3))
+        omega = np.broadcast_to(np.asarray(omega, dtype=float), (n_ev, 3))
+        R     = np.broadcast_to(np.asarray(R, dtype=float), (n_ev, 3, 3))
 
-            if abs(self._t - self._t_next_gyro) <= EPS:
-                cnt, meas = self.sample_gyro(omega_world_dps, R_world_to_sensor)
-                gyr_t.append(self._t); gyr_c.append(cnt); gyr_f.append(meas)
-                self._t_next_gyro += self._dt_gyro
+        return self._run_events(ev_t, indices, a_lin, omega, R)
 
-            if (self._t_next_mag is not None) and (abs(self._t - self._t_next_mag) <= EPS):
-                cnt, meas = self.sample_mag(R_world_to_sensor)
-                mag_t.append(self._t); mag_c.append(cnt); mag_f.append(meas)
-                self._t_next_mag += self._dt_mag
 
-        # Pack outputs as numpy arrays
-        def _pack(ts, cs, fs):
-            if len(ts) == 0:
+    def _run_events(self, ev_t: np.ndarray, indices: List[np.ndarray], a_lin: np.ndarray,
+                    omega: np.ndarray, R: np.ndarray) -> Dict[str, Dict[str, Any]]:
+        """
+        Step each sensor once over all of its scheduled events, given the motion at every event.
+        """
+        acc_i, gyr_i, mag_i = indices
+
+        # Step each sensor once over all of its timestamps and pack outputs as numpy arrays
+        def _pack(idx, step_batch, *inputs):
+            if len(idx) == 0:
                 return {"t": np.zeros(0), "counts": np.zeros((0,3), dtype=np.int16), 
                         "meas": np.zeros((0,3), float)}
-            return {"t": np.array(ts, float),
-                    "counts": np.vstack(cs).astype(np.int16),
-                    "meas": np.vstack(fs).astype(float)}
+            counts, meas = step_batch(*(x[idx] for x in inputs))
+            return {"t": ev_t[idx], "counts": counts, "meas": meas}
 
         return {
-            "accel": _pack(acc_t, acc_c, acc_f),
-            "gyro":  _pack(gyr_t, gyr_c, gyr_f),
-            "mag":   _pack(mag_t, mag_c, mag_f),
+            "accel": _pack(acc_i, self._accel_sim.step_batch, a_lin, R),
+            "gyro":  _pack(gyr_i, self._gyro_sim.step_batch, omega, R),
+            "mag":   _pack(mag_i, self._mag_sim.step_batch, R),
         }
\ No newline at end of file
@@ -0,0 +1,22 @@
+"""
+Optional Numba JIT support for the per-sample sensor kernels.
+
+Numba is not a hard dependency of the simulator. When it is installed the kernels are compiled
+with ``numba.njit``; otherwise ``njit`` is a no-op decorator and the kernels run as plain Python
+scalar code, which is still cheaper than chaining NumPy calls on 3-element arrays.
+"""
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        # Support both @njit and @njit(cache=True, ...)
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def _decorator(fn):
+            return fn
+        return _decorator
@@ -2,6 +2,11 @@ from dataclasses import dataclass
 import math
 import numpy as np
 
+from simulators.imu_sim.lib.filters import lpf_series, lpf_sos
+from simulators.imu_sim.lib.jit import HAVE_NUMBA, njit
+from simulators.imu_sim.lib.noise import NoisePool
+
+
 # AK8963 typical sensitivities (µT per LSB):
 #  - 14-bit: ≈ 0.6 µT/LSB  -> counts per µT ≈ 1.6666667
 #  - 16-bit: ≈ 0.15 µT/LSB -> counts per µT ≈ 6.6666667
@@ -10,7 +15,7 @@ COUNTS_PER_UT = {
     16: 1.0 / 0.15,
 }
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class MagSimConfig:
     range_bits: int
     odr_hz: float
@@ -21,18 +26,100 @@ class MagSimConfig:
     lpf_cut_hz: float
 
 
+@njit(cache=True)
+def _mag_step_kernel(R, world, bias, state, use_lpf, primed, alpha, one_minus_alpha,
+                     sigma, noise, cps, counts_out, meas_out):
+    """
+    Scalar magnetometer pipeline: rotate the world field, add bias, LPF, noise and quantize.
+    'state' is updated in place; results are written into 'counts_out' and 'meas_out'.
+    """
+    w0 = world[0]; w1 = world[1]; w2 = world[2]
+    for i in range(3):
+        # Rotate world magnetic field into sensor frame (unrolled 3x3 matvec) and apply bias
+        B_biased = R[i, 0] * w0 + R[i, 1] * w1 + R[i, 2] * w2 + bias[i]
+
+        # Optional LPF
+        if use_lpf:
+            if not primed:
+                state[i] = B_biased
+            else:
+                state[i] = alpha * state[i] + one_minus_alpha * B_biased
+            B_f = state[i]
+        else:
+            B_f = B_biased
+
+        # Add white Gaussian noise
+        B_noisy = B_f + sigma * noise[i]
+        meas_out[i] = B_noisy
+
+        # Quantize to counts (int16), using bit-dependent sensitivity
+        c = round(B_noisy * cps)
+        if c < -32768:
+            c = -32768
+        elif c > 32767:
+            c = 32767
+        counts_out[i] = c
+
+
+@njit(cache=True)
+def _mag_batch_kernel(R, world, bias, state, use_lpf, primed, alpha, one_minus_alpha,
+                      sigma, noise, cps, counts_out, meas_out):
+    """
+    Same pipeline as _mag_step_kernel over N rows in one compiled loop ('R' is (N, 3, 3)).
+    """
+    w0 = world[0]; w1 = world[1]; w2 = world[2]
+    for n in range(R.shape[0]):
+        for i in range(3):
+            B_biased = R[n, i, 0] * w0 + R[n, i, 1] * w1 + R[n, i, 2] * w2 + bias[i]
+
+            if use_lpf:
+                if not primed:
+                    state[i] = B_biased
+                else:
+                    state[i] = alpha * state[i] + one_minus_alpha * B_biased
+                B_f = state[i]
+            else:
+                B_f = B_biased
+
+            B_noisy = B_f + sigma * noise[n, i]
+            meas_out[n, i] = B_noisy
+
+            c = round(B_noisy * cps)
+            if c < -32768:
+                c = -32768
+            elif c > 32767:
+                c = 32767
+            counts_out[n, i] = c
+        primed = True
+
+
 class MagSim:
-    def __init__(self, cfg: MagSimConfig, seed: int | None = None) -> None:
+    ready = True
+
+    def __init__(self, cfg: MagSimConfig, seed: int | np.random.Generator | None = None) -> None:
         self.cfg   = cfg
         self.state = np.zeros(3, dtype=float)
         self._rng  = np.random.default_rng(seed)
 
+        self._bias  = np.asarray(cfg.bias_uT, dtype=float)
+        self._world = np.asarray(cfg.world_field_uT, dtype=float)
+        self._cps   = COUNTS_PER_UT[int(cfg.range_bits)]
+
+        self._noise = NoisePool(self._rng)
+
         # LPF coefficient (1st-order). If cutoff <= 0, LPF is disabled.
         if self.cfg.use_lpf and self.cfg.lpf_cut_hz > 0.0:
             dt = 1.0 / max(self.cfg.odr_hz, 1e-9)
             self._alpha = math.exp(-2.0 * math.pi * self.cfg.lpf_cut_hz * dt)
         else:
             self._alpha = None
+        self._one_minus_alpha = (1.0 - self._alpha) if self._alpha is not None else None
+
+        self._use_lpf = self._alpha is not None
+        self._k_alpha = self._alpha if self._use_lpf else 0.0
+        self._k_one_minus_alpha = self._one_minus_alpha if self._use_lpf else 0.0
+
+        self._sos = lpf_sos(self._alpha) if self._use_lpf else None
 
         # Warm-start flag: ensures the first output equals the first input
         self._primed = (self._alpha is None)
@@ -54,48 +141,81 @@ class MagSim:
         return self.cfg.noise_density_uT_sqrtHz * math.sqrt(bw_eq)
 
 
-    def ready(self, dt: float) -> bool:
-        return True
+    def filter_series(self, x: np.ndarray) -> np.ndarray:
+        """Run the LPF over an (N, 3) series of consecutive inputs, continuing from the current state."""
+        y = lpf_series(self._sos, self.state, self._primed, x)
+        self._primed = self._primed or x.shape[0] > 0
+        return y
 
 
-    def step(self, R_world_to_sensor: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    def step(self, R_world_to_sensor: np.ndarray,
+             counts_out: np.ndarray | None = None, meas_out: np.ndarray | None = None
+             ) -> tuple[np.ndarray, np.ndarray]:
         """
         Compute one magnetometer sample.
 
         Args:
             R_world_to_sensor: 3x3 rotation matrix (world → sensor).
+            counts_out: optional int16[3] buffer to write the counts into (e.g. a row of a
+                        preallocated output array). A new array is allocated when None.
+            meas_out: optional float64[3] buffer to write the measurement into.
 
         Returns:
             counts_int16[3]: quantized sensor counts.
             B_meas_uT[3]: simulated measurement in µT (sensor frame).
         """
-        # Rotate world magnetic field into sensor frame
-        B_true_s = R_world_to_sensor @ self.cfg.world_field_uT
+        counts = np.empty(3, dtype=np.int16) if counts_out is None else counts_out
+        B_meas = np.empty(3, dtype=float) if meas_out is None else meas_out
+        _mag_step_kernel(R_world_to_sensor, self._world, self._bias, self.state,
+                         self._use_lpf, self._primed, self._k_alpha, self._k_one_minus_alpha,
+                         self._sigma, self._noise.next(), self._cps, counts, B_meas)
+        self._primed = True
+        return counts, B_meas
 
-        # Apply static hard-iron bias
-        B_biased = B_true_s + self.cfg.bias_uT
 
-        # Optional LPF
-        if self._alpha is not None:
-            if not self._primed:
-                self.state[:] = B_biased
-                self._primed = True
-            else:
-                self.state = self._alpha * self.state + (1.0 - self._alpha) * B_biased
-            B_f = self.state
-        else:
-            B_f = B_biased
+    def step_batch(self, R_world_to_sensor: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Compute N consecutive magnetometer samples at once.
 
-        # Add white Gaussian noise
-        noise = self._rng.normal(0.0, self._sigma, size=3)
-        B_noisy = B_f + noise
+        Args:
+            R_world_to_sensor: (N, 3, 3) stack of rotation matrices (world → sensor).
 
-        # Quantize to counts (int16), using bit-dependent sensitivity
-        cps = COUNTS_PER_UT[int(self.cfg.range_bits)]
-        counts = np.rint(B_noisy * cps).astype(np.int32)
-        counts = np.clip(counts, -32768, 32767).astype(np.int16)
+        Returns:
+            counts_int16[N, 3]: quantized sensor counts.
+            B_meas_uT[N, 3]: simulated measurements in µT (sensor frame).
+
+        The LPF state is shared with step(), so batches and single steps can be interleaved.
+        """
+        R = np.asarray(R_world_to_sensor, dtype=float).reshape(-1, 3, 3)
+        n = R.shape[0]
+
+        if HAVE_NUMBA:
+            counts = np.empty((n, 3), dtype=np.int16)
+            B_meas = np.empty((n, 3), dtype=float)
+            _mag_batch_kernel(R, self._world, self._bias, self.state,
+                              self._use_lpf, self._primed, self._k_alpha, self._k_one_minus_alpha,
+                              self._sigma, self._noise.take(n), self._cps, counts, B_meas)
+            self._primed = self._primed or n > 0
+            return counts, B_meas
+
+        # Rotate world magnetic field into sensor frame and apply hard-iron bias
+        w0, w1, w2 = self._world
+        B_biased = R[..., 0] * w0 + R[..., 1] * w1 + R[..., 2] * w2 + self._bias
+
+        # Apply optional LPF
+        B_f = self.filter_series(B_biased)
+
+        # Add white Gaussian noise (same draw order as N calls to step())
+        B_noisy = B_f + self._sigma * self._noise.take(n)
+
+        # Quantize to counts (int16), using bit-dependent sensitivity; one float scratch array
+        # is rounded and saturated in place, then cast once
+        counts = np.multiply(B_noisy, self._cps)
+        np.rint(counts, out=counts)
+        np.minimum(counts, 32767, out=counts)
+        np.maximum(counts, -32768, out=counts)
 
-        return counts, B_noisy.astype(float)
+        return counts.astype(np.int16), B_noisy
 
 
     @classmethod
@@ -107,7 +227,7 @@ class MagSim:
                     world_field_uT: list[float],
                     use_lpf: bool,
                     lpf_cut_hz: float,
-                    seed: int | None = None) -> "MagSim":
+                    seed: int | np.random.Generator | None = None) -> "MagSim":
         """Factory method to build a MagSim from configuration parameters."""
         cfg = MagSimConfig(
             range_bits=int(range_bits),
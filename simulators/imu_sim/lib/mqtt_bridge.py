@@ -1,24 +1,50 @@
 import json
 import logging
+import math
 import time
-from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional, Dict, Any
 
 import numpy as np
 import paho.mqtt.client as mqtt
 
-from jsonschema import validate
+from jsonschema import Draft7Validator
 from jsonschema.exceptions import ValidationError
 
 from simulators.imu_sim.lib.imu_sim import MPU9250
 
 LOG = logging.getLogger("imu_sim.bridge")
 
+# Wave parameters accepted on the control topic
+WAVE_KEYS = ("amp", "freq", "spike_prob", "spike_amp")
+
+# Compact JSON body of an IMU message. Floats are formatted with repr(), which is what json.dumps
+# emits for finite floats, so the wire format is unchanged.
+PAYLOAD_TEMPLATE = ('{"ax":%r,"ay":%r,"az":%r,"gx":%r,"gy":%r,"gz":%r,'
+                    '"mx":%r,"my":%r,"mz":%r,"ts":"%s","seq":%d}')
+
+
+def iso_utc(ts: float) -> str:
+    # Format epoch seconds as an ISO-8601 UTC timestamp with milliseconds and trailing 'Z'.
+    # Same output as datetime.fromtimestamp(ts, timezone.utc).isoformat(timespec="milliseconds")
+    # with 'Z', without building datetime/tzinfo objects: the fraction is rounded to
+    # microseconds as datetime does, then truncated to milliseconds.
+    frac, whole = math.modf(ts)
+    us = round(frac * 1e6)
+    if us >= 1000000:
+        whole += 1.0
+        us -= 1000000
+    elif us < 0:
+        whole -= 1.0
+        us += 1000000
+    tm = time.gmtime(whole)
+    return "%04d-%02d-%02dT%02d:%02d:%02d.%03dZ" % (
+        tm.tm_year, tm.tm_mon, tm.tm_mday, tm.tm_hour, tm.tm_min, tm.tm_sec, us // 1000)
+
 
 def now_iso() -> str:
     # Return ISO-8601 UTC timestamp with milliseconds and trailing 'Z'.
-    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+    return iso_utc(time.time())
 
 
 class IMUPublisher:
@@ -38,16 +64,21 @@ class IMUPublisher:
         self.validate_schema: bool = False
         self.schema_path: Optional[Path] = None
         self._schema: Optional[Dict[str, Any]] = None
+        self._validator: Optional[Draft7Validator] = None
 
         self.client: Optional[mqtt.Client] = None
         self._running = False
         self._seq = 0
 
         self.log_messages: bool = False
+        self.busy_wait: bool = False
+        self.skip_duplicates: bool = False
 
         self._load_mqtt_config()
         self.control_topic = "land/imu"
         self.wave_cfg = {"amp": 0.0, "freq": 0.0, "spike_prob": 0.0, "spike_amp": 0.0}
+        # Dedicated RNG for wave spikes (reseeded by read_and_init_imu)
+        self._wave_rng = np.random.default_rng()
         # Heading control from land/imu (degrees). When negative, yaw simulation disabled.
         self.heading = -1.0
         self._base_heading_deg = 0.0
@@ -64,6 +95,13 @@ class IMUPublisher:
         # Any additional alignment would introduce constant 90°/sign errors.
         self._align_mirror_east_west = False
         self._align_offset_deg = 0.0
+        # Single-slot cache of the last attitude and its rotation matrix (read-only for callers)
+        self._last_angles = None
+        self._last_R = None
+        # _motion() output buffers: omega is overwritten on every call, a_lin is always zero
+        self._omega = np.empty(3, dtype=float)
+        self._a_lin = np.zeros(3, dtype=float)
+        self._a_lin.setflags(write=False)
 
     def _load_mqtt_config(self) -> None:
         import configparser
@@ -103,6 +141,16 @@ class IMUPublisher:
             self.log_messages = mqtt_section.getboolean("log_messages", fallback=False)
         except Exception:
             self.log_messages = False
+        # Spin for sub-millisecond waits in the publish loop (lower jitter, but keeps a core busy)
+        try:
+            self.busy_wait = mqtt_section.getboolean("busy_wait", fallback=False)
+        except Exception:
+            self.busy_wait = False
+        # Skip publishing when accel/gyro/mag values are unchanged since the last message
+        try:
+            self.skip_duplicates = mqtt_section.getboolean("skip_duplicates", fallback=False)
+        except Exception:
+            self.skip_duplicates = False
 
         LOG.debug(
             "MQTT config loaded: host=%s port=%s client_id=%s topic=%s qos=%s validate_schema=%s schema_path=%s log_messages=%s",
@@ -145,6 +193,7 @@ class IMUPublisher:
             return
 
         self._schema = schema
+        self._validator = Draft7Validator(schema)
         LOG.info("Loaded schema for topic %s from %s", self.topic, self.schema_path)
 
     def read_and_init_imu(self,
@@ -152,9 +201,11 @@ class IMUPublisher:
                           gyro_seed: Optional[int] = 1,
                           mag_seed: Optional[int] = 1,
                           accel_lpf_hz: float = 100.0,
-                          gyro_lpf_hz: float = 98.0) -> None:
+                          gyro_lpf_hz: float = 98.0,
+                          wave_seed: Optional[int] = 1) -> None:
         # Read IMU config and initialize the internal simulators.
         LOG.info("Reading IMU config from %s", self.config_path)
+        self._wave_rng = np.random.default_rng(wave_seed)
         self.imu.read_config()
         self.imu.init_all_sims(
             accel_seed=accel_seed,
@@ -199,60 +250,50 @@ class IMUPublisher:
         if msg.topic != self.control_topic:
             return
         try:
-            data = json.loads(msg.payload.decode())
+            # json.loads accepts the raw payload bytes (UTF-8 detected), no decode() copy needed
+            data = json.loads(msg.payload)
         except Exception:
             return
+        if not isinstance(data, dict):
+            return
         ctrl = str(data.get("control", "")).upper()
         if ctrl == "START":
-            self.wave_cfg = {
-                "amp": float(data.get("amp", 0.0)),
-                "freq": float(data.get("freq", 0.0)),
-                "spike_prob": float(data.get("spike_prob", 0.0)),
-                "spike_amp": float(data.get("spike_amp", 0.0)),
-            }
-            if "heading" in data:
-                try:
-                    h = float(data.get("heading"))
-                    self.heading = h
-                    if h >= 0:
-                        self._base_heading_deg = h
-                        self._disable_yaw = False
-                    else:
-                        self._disable_yaw = True
-                except Exception:
-                    pass
+            self.wave_cfg = {k: float(data.get(k, 0.0)) for k in WAVE_KEYS}
+            self._set_heading(data.get("heading"))
             self._active = True
             self._sim_start = time.time()
-            now = time.time()
+            now = time.monotonic()
             self._t_next_acc = now
             self._t_next_gyro = now
             self._t_next_mag = now
         elif ctrl == "STOP":
             self._active = False
         else:
-            # Treat messages without START/STOP as parameter updates
-            updated = False
-            if "heading" in data:
-                try:
-                    h = float(data.get("heading"))
-                    self.heading = h
-                    if h >= 0:
-                        self._base_heading_deg = h
-                        self._disable_yaw = False
-                    else:
-                        self._disable_yaw = True
-                    updated = True
-                except Exception:
-                    pass
-            # Update wave configuration live if provided
-            for k in ("amp", "freq", "spike_prob", "spike_amp"):
-                if k in data:
+            # Treat messages without START/STOP as parameter updates; an active run keeps going
+            self._set_heading(data.get("heading"))
+            # Update wave configuration live if provided (one lookup per key; null is ignored)
+            for k in WAVE_KEYS:
+                v = data.get(k)
+                if v is not None:
                     try:
-                        self.wave_cfg[k] = float(data.get(k, 0.0))
-                        updated = True
+                        self.wave_cfg[k] = float(v)
                     except Exception:
                         pass
-            # If we updated parameters during active run, keep running without restart
+
+    def _set_heading(self, value) -> None:
+        # Apply a heading from land/imu (degrees); negative disables yaw. None/invalid is ignored.
+        if value is None:
+            return
+        try:
+            h = float(value)
+        except Exception:
+            return
+        self.heading = h
+        if h >= 0:
+            self._base_heading_deg = h
+            self._disable_yaw = False
+        else:
+            self._disable_yaw = True
 
     def _motion(self, t: float):
         amp = float(self.wave_cfg.get("amp", 0.0))
@@ -260,16 +301,23 @@ class IMUPublisher:
         spike_prob = float(self.wave_cfg.get("spike_prob", 0.0))
         spike_amp = float(self.wave_cfg.get("spike_amp", 0.0))
 
-        if spike_prob > 0.0 and np.random.random() < spike_prob:
-            sign = 1.0 if np.random.random() < 0.5 else -1.0
-            roll_spike = sign * spike_amp
-            pitch_spike = sign * (0.6 * spike_amp)
-            yaw_spike = sign * (0.3 * spike_amp)
-        else:
-            roll_spike = pitch_spike = yaw_spike = 0.0
+        roll_spike = pitch_spike = yaw_spike = 0.0
+        if spike_prob > 0.0:
+            # Spike trigger and sign come from one draw of the seeded wave RNG
+            u_spike, u_sign = self._wave_rng.random(2)
+            if u_spike < spike_prob:
+                sign = 1.0 if u_sign < 0.5 else -1.0
+                roll_spike = sign * spike_amp
+                pitch_spike = sign * (0.6 * spike_amp)
+                yaw_spike = sign * (0.3 * spike_amp)
 
-        roll_deg = amp * np.sin(2.0 * np.pi * freq * t) + roll_spike
-        pitch_deg = (amp / 2.0) * np.sin(2.0 * np.pi * freq * t + np.pi / 2.0) + pitch_spike
+        # Wave phase; roll, pitch and yaw use it with 0, 90 and 60 degree offsets
+        theta = 2.0 * math.pi * freq * t
+        theta_pitch = theta + math.pi / 2.0
+        theta_yaw = theta + math.pi / 3.0
+
+        roll_deg = amp * math.sin(theta) + roll_spike
+        pitch_deg = (amp / 2.0) * math.sin(theta_pitch) + pitch_spike
 
         if self._disable_yaw:
             yaw_wave_amp_deg = 0.0
@@ -277,7 +325,7 @@ class IMUPublisher:
         else:
             base_heading_deg = float(self._base_heading_deg)
             yaw_wave_amp_deg = max(0.2, amp * 0.03)
-        yaw_wave = yaw_wave_amp_deg * np.sin(2.0 * np.pi * freq * t + np.pi / 3.0)
+        yaw_wave = yaw_wave_amp_deg * math.sin(theta_yaw)
         raw_yaw_deg = base_heading_deg + yaw_wave + yaw_spike
 
         # Use yaw directly so that backend-computed heading equals the base heading
@@ -286,31 +334,38 @@ class IMUPublisher:
         else:
             yaw_deg = raw_yaw_deg + self._align_offset_deg
 
-        roll_rad = np.radians(roll_deg)
-        pitch_rad = np.radians(pitch_deg)
-        yaw_rad = np.radians(yaw_deg)
-
-        cr, sr = np.cos(roll_rad), np.sin(roll_rad)
-        cp, sp = np.cos(pitch_rad), np.sin(pitch_rad)
-        cy, sy = np.cos(yaw_rad), np.sin(yaw_rad)
-        R = np.array([
-            [cy * cp, cy * sp * sr - sy * cr, cy * sp * cr + sy * sr],
-            [sy * cp, sy * sp * sr + cy * cr, sy * sp * cr - cy * sr],
-            [-sp, cp * sr, cp * cr],
-        ], dtype=float)
-
-        roll_rate = amp * 2.0 * np.pi * freq * np.cos(2.0 * np.pi * freq * t)
-        pitch_rate = (amp / 2.0) * 2.0 * np.pi * freq * np.cos(2.0 * np.pi * freq * t + np.pi / 2.0)
-        raw_yaw_rate = yaw_wave_amp_deg * 2.0 * np.pi * freq * np.cos(2.0 * np.pi * freq * t + np.pi / 3.0)
-        yaw_rate = (-raw_yaw_rate) if self._align_mirror_east_west else raw_yaw_rate
-        omega = np.array([roll_rate, pitch_rate, yaw_rate], dtype=float)
-
-        a_lin = np.zeros(3, dtype=float)
-        return a_lin, omega, R
+        # Calm water (or a fixed heading) repeats the same attitude every tick; reuse its matrix
+        angles = (roll_deg, pitch_deg, yaw_deg)
+        if angles == self._last_angles:
+            R = self._last_R
+        else:
+            roll_rad = math.radians(roll_deg)
+            pitch_rad = math.radians(pitch_deg)
+            yaw_rad = math.radians(yaw_deg)
+
+            cr, sr = math.cos(roll_rad), math.sin(roll_rad)
+            cp, sp = math.cos(pitch_rad), math.sin(pitch_rad)
+            cy, sy = math.cos(yaw_rad), math.sin(yaw_rad)
+
+            # Scalar stores into an empty buffer avoid walking a nested list in np.array()
+            R = np.empty((3, 3), dtype=float)
+            R[0, 0] = cy * cp; R[0, 1] = cy * sp * sr - sy * cr; R[0, 2] = cy * sp * cr + sy * sr
+            R[1, 0] = sy * cp; R[1, 1] = sy * sp * sr + cy * cr; R[1, 2] = sy * sp * cr - cy * sr
+            R[2, 0] = -sp;     R[2, 1] = cp * sr;                R[2, 2] = cp * cr
+            self._last_angles = angles
+            self._last_R = R
+
+        raw_yaw_rate = yaw_wave_amp_deg * 2.0 * math.pi * freq * math.cos(theta_yaw)
+        omega = self._omega
+        omega[0] = amp * 2.0 * math.pi * freq * math.cos(theta)
+        omega[1] = (amp / 2.0) * 2.0 * math.pi * freq * math.cos(theta_pitch)
+        omega[2] = (-raw_yaw_rate) if self._align_mirror_east_west else raw_yaw_rate
+
+        return self._a_lin, omega, R
 
     def start(self) -> None:
         # Start publishing loop (blocks until stop()).
-        if not hasattr(self.imu, "_accel_sim") or not hasattr(self.imu, "_gyro_sim"):
+        if self.imu._accel_sim is None or self.imu._gyro_sim is None:
             raise RuntimeError("Call read_and_init_imu() before start()")
 
         if self.validate_schema and self._schema is None:
@@ -334,10 +389,12 @@ class IMUPublisher:
         # Target publish cadence: 10 Hz (anchored)
         self._dt_pub = 0.1
 
-        # Next-sample timestamps
-        self._t_next_acc = time.time()
-        self._t_next_gyro = time.time()
-        self._t_next_mag = time.time()
+        # Next-sample deadlines on the monotonic clock, so wall-clock (NTP) adjustments cannot
+        # stall or burst the sensor schedule; sample timestamps still use wall-clock time
+        t0 = time.monotonic()
+        self._t_next_acc = t0
+        self._t_next_gyro = t0
+        self._t_next_mag = t0
         # Anchored publish scheduler
         self._t0_pub = time.monotonic()
         self._last_pub_tick = -1
@@ -352,6 +409,13 @@ class IMUPublisher:
         last_gyro_ts = 0.0
         last_mag_ts = 0.0
 
+        # Sensor values of the last published message (for skip_duplicates)
+        last_published = None
+
+        # Resolve logging once: per-message logging needs INFO, publish tracing needs DEBUG
+        log_messages = self.log_messages and LOG.isEnabledFor(logging.INFO)
+        log_debug = LOG.isEnabledFor(logging.DEBUG)
+
         self._running = True
         LOG.info(
             "Starting IMU publisher: accel ODR=%.1fHz gyro ODR=%.1fHz mag ODR=%.1fHz -> topic %s (qos=%d)",
@@ -368,15 +432,16 @@ class IMUPublisher:
                     time.sleep(0.1)
                     continue
                 now_t = time.time()
+                now_m = time.monotonic()
                 sim_t = now_t - self._sim_start
                 sampled = False
 
                 # Compute motion only when a sensor needs sampling
-                if now_t >= self._t_next_acc or now_t >= self._t_next_gyro or now_t >= self._t_next_mag:
+                if now_m >= self._t_next_acc or now_m >= self._t_next_gyro or now_m >= self._t_next_mag:
                     a_lin, omega, R = self._motion(sim_t)
 
                 # Sample accelerometer when scheduled
-                if now_t >= self._t_next_acc:
+                if now_m >= self._t_next_acc:
                     _, a_g = self.imu.sample_accel(a_lin, R)
                     last_acc = [float(a_g[0]), float(a_g[1]), float(a_g[2])]
                     last_acc_ts = now_t
@@ -384,7 +449,7 @@ class IMUPublisher:
                     sampled = True
 
                 # Sample gyroscope when scheduled
-                if now_t >= self._t_next_gyro:
+                if now_m >= self._t_next_gyro:
                     _, w = self.imu.sample_gyro(omega, R)
                     last_gyro = [float(w[0]), float(w[1]), float(w[2])]
                     last_gyro_ts = now_t
@@ -392,7 +457,7 @@ class IMUPublisher:
                     sampled = True
 
                 # Sample magnetometer when scheduled
-                if now_t >= self._t_next_mag:
+                if now_m >= self._t_next_mag:
                     _, m = self.imu.sample_mag(R)
                     last_mag = [float(m[0]), float(m[1]), float(m[2])]
                     last_mag_ts = now_t
@@ -403,33 +468,46 @@ class IMUPublisher:
                 now_m = time.monotonic()
                 tick = int((now_m - self._t0_pub) / self._dt_pub)
                 if tick > self._last_pub_tick:
+                    # Optionally drop a publish whose sensor values repeat the previous one
+                    if self.skip_duplicates:
+                        values = (*last_acc, *last_gyro, *last_mag)
+                        if values == last_published:
+                            self._last_pub_tick = tick
+                            continue
+
                     latest_sample_ts = max(last_acc_ts, last_gyro_ts, last_mag_ts) or now_t
-                    ts_iso = datetime.fromtimestamp(latest_sample_ts, timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
-
-                    payload = {
-                        "ax": last_acc[0],
-                        "ay": last_acc[1],
-                        "az": last_acc[2],
-                        "gx": last_gyro[0],
-                        "gy": last_gyro[1],
-                        "gz": last_gyro[2],
-                        "mx": last_mag[0],
-                        "my": last_mag[1],
-                        "mz": last_mag[2],
-                        "ts": ts_iso,
-                        "seq": int(self._seq),
-                    }
-                    self._seq += 1
+                    ts_iso = iso_utc(latest_sample_ts)
 
-                    if self.validate_schema and self._schema is not None:
+                    seq = int(self._seq)
+                    self._seq += 1
+                    body = PAYLOAD_TEMPLATE % (*last_acc, *last_gyro, *last_mag, ts_iso, seq)
+
+                    # The dict form is only needed for schema validation and message logging
+                    if self.validate_schema or log_messages:
+                        payload = {
+                            "ax": last_acc[0],
+                            "ay": last_acc[1],
+                            "az": last_acc[2],
+                            "gx": last_gyro[0],
+                            "gy": last_gyro[1],
+                            "gz": last_gyro[2],
+                            "mx": last_mag[0],
+                            "my": last_mag[1],
+                            "mz": last_mag[2],
+                            "ts": ts_iso,
+                            "seq": seq,
+                        }
+
+                    # Boolean check first; only a failing payload pays for building the error
+                    if self.validate_schema and self._validator is not None and not self._validator.is_valid(payload):
                         try:
-                            validate(instance=payload, schema=self._schema)
+                            self._validator.validate(payload)
                         except ValidationError as ve:
                             LOG.warning("Outgoing payload failed schema validation: %s", ve.message)
-                            self._t_next_pub += self._dt_pub
-                            continue
+                        self._last_pub_tick = tick
+                        continue
 
-                    if self.log_messages:
+                    if log_messages:
                         try:
                             log_msg = {"topic": self.topic, "ts_local": now_iso(), "payload": payload}
                             LOG.info(json.dumps(log_msg, separators=(",", ":"), ensure_ascii=False))
@@ -437,17 +515,28 @@ class IMUPublisher:
                             LOG.debug("Failed to log outgoing message")
 
                     try:
-                        self.client.publish(self.topic, json.dumps(payload, separators=(",", ":")), qos=self.qos, retain=False)
-                        LOG.debug("Published seq=%s to %s", payload["seq"], self.topic)
+                        info = self.client.publish(self.topic, body, qos=self.qos, retain=False)
+                        # Only a message the client accepted counts for duplicate suppression
+                        if self.skip_duplicates and info.rc == mqtt.MQTT_ERR_SUCCESS:
+                            last_published = values
+                        if log_debug:
+                            LOG.debug("Published seq=%s to %s", seq, self.topic)
                     except Exception as e:
                         LOG.warning("Failed to publish: %s", e)
                     self._last_pub_tick = tick
 
                 # Sleep until the next scheduled event (include publish cadence)
                 next_pub_time = self._t0_pub + (self._last_pub_tick + 1) * self._dt_pub
-                next_events = [self._t_next_acc, self._t_next_gyro, self._t_next_mag, next_pub_time]
-                sleep_until = min(next_events) - time.time()
-                if sleep_until > 0:
+                next_event = min(self._t_next_acc, self._t_next_gyro, self._t_next_mag, next_pub_time)
+                sleep_until = next_event - time.monotonic()
+                if self.busy_wait:
+                    # Coarse sleep with a 1 ms margin, then spin: sub-ms waits without OS-tick oversleep
+                    if sleep_until > 0.002:
+                        time.sleep(min(sleep_until - 0.001, 0.1))
+                    else:
+                        while time.monotonic() < next_event:
+                            pass
+                elif sleep_until > 0:
                     time.sleep(min(max(sleep_until, 0.001), 0.1))
                 else:
                     time.sleep(0.001)
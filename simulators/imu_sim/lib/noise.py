@@ -0,0 +1,52 @@
+"""
+Pre-drawn standard-normal noise shared by the sensor simulators.
+"""
+
+import functools
+import numpy as np
+
+
+# Number of standard-normal noise triplets drawn per RNG call
+NOISE_POOL_LEN = 4096
+
+
+class NoisePool:
+    """
+    Standard-normal noise triplets drawn from 'rng' in blocks of NOISE_POOL_LEN rows, which
+    amortizes the RNG call cost over many samples.
+
+    next() and take() consume the same stream, so N calls to next() and one take(N) return
+    the same values and single steps and batches can be interleaved.
+    """
+
+    __slots__ = ("_standard_normal", "_dtype", "_pool", "_idx")
+
+    def __init__(self, rng: np.random.Generator, dtype: type = np.float64) -> None:
+        self._dtype = np.dtype(dtype)
+        self._standard_normal = functools.partial(rng.standard_normal, dtype=self._dtype)
+        self._pool = np.empty((NOISE_POOL_LEN, 3), dtype=self._dtype)
+        self._idx  = NOISE_POOL_LEN
+
+
+    def next(self) -> np.ndarray:
+        """Return the next triplet as a view into the pool (valid until the next refill)."""
+        if self._idx == NOISE_POOL_LEN:
+            self._standard_normal(out=self._pool)
+            self._idx = 0
+        noise = self._pool[self._idx]
+        self._idx += 1
+        return noise
+
+
+    def take(self, n: int) -> np.ndarray:
+        """Return the next 'n' triplets as an (n, 3) array."""
+        avail = NOISE_POOL_LEN - self._idx
+        if n <= avail:
+            noise = self._pool[self._idx:self._idx + n]
+            self._idx += n
+            return noise
+        noise = np.empty((n, 3), dtype=self._dtype)
+        noise[:avail] = self._pool[self._idx:]
+        self._standard_normal(out=noise[avail:])
+        self._idx = NOISE_POOL_LEN
+        return noise
@@ -2,6 +2,8 @@ import math
 import numpy as np
 import pytest
 
+from simulators.imu_sim.lib import accelerometer_sim
+from simulators.imu_sim.lib.accelerometer_sim import AccelSim, AccelSimConfig, AccelSimEnsemble
 from simulators.imu_sim.lib.imu_sim import MPU9250
 
 
@@ -99,33 +101,27 @@ world_z = 40.0
 """
 
 
-def write_cfg(tmp_path, content: str) -> str:
-    p = tmp_path / "imu_config.ini"
-    p.write_text(content, encoding="utf-8")
-    return str(p)
-
-
-def test_sample_requires_init(tmp_path):
+def test_sample_requires_init():
     """
-    sample_accel() must not be callable before init_accel_sim().
+    sample_accel() and sample_accel_batch() must not be callable before init_accel_sim().
     """
-    cfg_path = write_cfg(tmp_path, CONFIG_NO_NOISE)
-    imu = MPU9250(cfg_path)
-    imu.read_config()
+    imu = MPU9250()
+    imu.read_config_from_string(CONFIG_NO_NOISE)
     R = np.eye(3)
     a_lin = np.zeros(3)
     with pytest.raises(RuntimeError):
         imu.sample_accel(a_lin, R)
+    with pytest.raises(RuntimeError):
+        imu.sample_accel_batch(a_lin[None, :], R)
 
 
-def test_static_rest_1g_no_noise(tmp_path):
+def test_static_rest_1g_no_noise():
     """
     With zero linear acceleration, identity rotation, zero bias and no noise,
     we expect ~[0, 0, +1.0] g and the corresponding int16 counts for ±2 g.
     """
-    cfg_path = write_cfg(tmp_path, CONFIG_NO_NOISE)
-    imu = MPU9250(cfg_path)
-    imu.read_config()
+    imu = MPU9250()
+    imu.read_config_from_string(CONFIG_NO_NOISE)
     imu.init_accel_sim(seed=123, lpf_cut_hz=100.0)
 
     R = np.eye(3)
@@ -140,13 +136,12 @@ def test_static_rest_1g_no_noise(tmp_path):
     assert counts[2] == 16384
 
 
-def test_bias_effect_is_applied(tmp_path):
+def test_bias_effect_is_applied():
     """
     Non-zero bias should shift the output in g units before quantization.
     """
-    cfg_path = write_cfg(tmp_path, CONFIG_WITH_BIAS)
-    imu = MPU9250(cfg_path)
-    imu.read_config()
+    imu = MPU9250()
+    imu.read_config_from_string(CONFIG_WITH_BIAS)
     imu.init_accel_sim(seed=0, lpf_cut_hz=100.0)
 
     R = np.eye(3)
@@ -166,14 +161,13 @@ def test_bias_effect_is_applied(tmp_path):
     assert counts[2] == exp_counts[2]
 
 
-def test_saturation_clip_at_range_edges(tmp_path):
+def test_saturation_clip_at_range_edges():
     """
     A large positive Z linear acceleration should saturate at +range,
     and counts should clip at int16 max.
     """
-    cfg_path = write_cfg(tmp_path, CONFIG_NO_NOISE)
-    imu = MPU9250(cfg_path)
-    imu.read_config()
+    imu = MPU9250()
+    imu.read_config_from_string(CONFIG_NO_NOISE)
     imu.init_accel_sim(seed=0, lpf_cut_hz=0.0)
 
     R = np.eye(3)
@@ -188,18 +182,34 @@ def test_saturation_clip_at_range_edges(tmp_path):
     assert counts[0] == 0 and counts[1] == 0
 
 
-def test_lpf_roughly_attenuates_high_frequency(tmp_path):
+def test_lpf_is_single_first_order_stage():
+    """
+    After priming, a step input must follow y[n] = α*y[n-1] + (1-α)*x[n] exactly once per sample.
+    """
+    imu = MPU9250()
+    imu.read_config_from_string(CONFIG_NO_NOISE)
+    imu.init_accel_sim(seed=0, lpf_cut_hz=10.0)
+
+    R = np.eye(3)
+    _, a_g0 = imu.sample_accel(np.zeros(3), R)
+    assert abs(a_g0[0]) < 1e-12
+
+    # 1 g step on X (world == sensor)
+    _, a_g1 = imu.sample_accel(np.array([9.80665, 0.0, 0.0]), R)
+    alpha = math.exp(-2.0 * math.pi * 10.0 / imu.accel_odr_hz)
+    assert a_g1[0] == pytest.approx(1.0 - alpha, abs=1e-12)
+
+
+def test_lpf_roughly_attenuates_high_frequency():
     """
     With a low LPF cutoff, a high-frequency sinusoidal linear acceleration on X
     should be significantly attenuated compared to a high cutoff.
     """
-    cfg_path = write_cfg(tmp_path, CONFIG_LPF)
-    imu = MPU9250(cfg_path)
-    imu.read_config()
-
     # Two simulators: low cutoff (20 Hz) vs high cutoff (500 Hz approx passthrough)
-    imu_low = MPU9250(cfg_path); imu_low.read_config();  imu_low.init_accel_sim(seed=0, lpf_cut_hz=20.0)
-    imu_high = MPU9250(cfg_path); imu_high.read_config(); imu_high.init_accel_sim(seed=0, lpf_cut_hz=500.0)
+    imu_low = MPU9250(); imu_low.read_config_from_string(CONFIG_LPF)
+    imu_low.init_accel_sim(seed=0, lpf_cut_hz=20.0)
+    imu_high = MPU9250(); imu_high.read_config_from_string(CONFIG_LPF)
+    imu_high.init_accel_sim(seed=0, lpf_cut_hz=500.0)
 
     R = np.eye(3)
 
@@ -213,21 +223,105 @@ def test_lpf_roughly_attenuates_high_frequency(tmp_path):
     amp_g = 0.2  # 0.2 g amplitude
     a_x_ms2 = amp_g * 9.80665 * np.sin(2 * math.pi * 200.0 * t)
 
-    x_low = []
-    x_high = []
-    for i in range(N):
-        a_lin = np.array([a_x_ms2[i], 0.0, 0.0], dtype=float)
-        _, a_g_low = imu_low.sample_accel(a_lin, R)
-        _, a_g_high = imu_high.sample_accel(a_lin, R)
-        x_low.append(a_g_low[0])
-        x_high.append(a_g_high[0])
-
-    x_low = np.array(x_low)
-    x_high = np.array(x_high)
+    a_lin = np.zeros((N, 3))
+    a_lin[:, 0] = a_x_ms2
+    _, a_g_low = imu_low.sample_accel_batch(a_lin, R)
+    _, a_g_high = imu_high.sample_accel_batch(a_lin, R)
 
-    # Remove any DC (should be ~0 anyway) and compare RMS
-    rms_low = np.sqrt(np.mean((x_low - np.mean(x_low))**2))
-    rms_high = np.sqrt(np.mean((x_high - np.mean(x_high))**2))
+    # Remove any DC (should be ~0 anyway) and compare RMS, i.e. the standard deviation
+    rms_low = a_g_low[:, 0].std()
+    rms_high = a_g_high[:, 0].std()
 
     # Expect strong attenuation at 200 Hz for 20 Hz cutoff
     assert rms_low < 0.5 * rms_high
+
+
+def test_float32_state_matches_float64():
+    """
+    The float32 internal path must track the float64 one within single precision
+    and still return float64 measurements.
+    """
+    imu64 = MPU9250(); imu64.read_config_from_string(CONFIG_WITH_BIAS)
+    imu64.init_accel_sim(seed=0, lpf_cut_hz=20.0)
+    imu32 = MPU9250(); imu32.read_config_from_string(CONFIG_WITH_BIAS)
+    imu32.init_accel_sim(seed=0, lpf_cut_hz=20.0, dtype=np.float32)
+
+    R = np.eye(3)
+    for k in range(50):
+        a = np.array([math.sin(0.1 * k), 0.0, 0.0]) * 9.80665
+        c64, a64 = imu64.sample_accel(a, R)
+        c32, a32 = imu32.sample_accel(a, R)
+        assert a32.dtype == np.float64
+        assert np.allclose(a32, a64, atol=1e-5)
+        assert np.all(np.abs(c32.astype(int) - c64.astype(int)) <= 1)
+
+
+def test_ensemble_matches_individual_sims():
+    """
+    Without noise, each ensemble member must reproduce a standalone AccelSim with the same config.
+    """
+    cfgs = [
+        AccelSimConfig(2, 1000.0, np.array([0.01, 0.0, -0.02]), 0.0, True, 20.0),
+        AccelSimConfig(4, 1000.0, np.zeros(3), 0.0, False, 0.0),
+        AccelSimConfig(16, 250.0, np.array([0.0, 0.05, 0.0]), 0.0, True, 50.0),
+    ]
+    ens = AccelSimEnsemble(cfgs, seed=0)
+    sims = [AccelSim(cfg, seed=0) for cfg in cfgs]
+
+    rng = np.random.default_rng(1)
+    for _ in range(20):
+        A = rng.normal(scale=15.0, size=(3, len(cfgs)))
+        c_ens, a_ens = ens.step_ensemble(A, np.eye(3))
+        for k, sim in enumerate(sims):
+            c, a = sim.step(A[:, k], np.eye(3))
+            assert np.allclose(a_ens[:, k], a, atol=1e-12)
+            assert np.array_equal(c_ens[:, k], c)
+
+
+def test_ensemble_honours_member_dtype():
+    """
+    A float32 ensemble keeps float32 state and tracks the float64 one; mixed dtypes are rejected.
+    """
+    cfg64 = AccelSimConfig(2, 1000.0, np.array([0.01, 0.0, -0.02]), 0.0, True, 20.0)
+    cfg32 = AccelSimConfig(2, 1000.0, np.array([0.01, 0.0, -0.02]), 0.0, True, 20.0, dtype=np.float32)
+    ens64 = AccelSimEnsemble([cfg64, cfg64], seed=0)
+    ens32 = AccelSimEnsemble([cfg32, cfg32], seed=0)
+    assert ens32.state.dtype == np.float32
+
+    rng = np.random.default_rng(1)
+    for _ in range(20):
+        A = rng.normal(scale=5.0, size=(3, 2))
+        _, a64 = ens64.step_ensemble(A, np.eye(3))
+        _, a32 = ens32.step_ensemble(A, np.eye(3))
+        assert a32.dtype == np.float64
+        assert np.allclose(a32, a64, atol=1e-5)
+
+    with pytest.raises(ValueError):
+        AccelSimEnsemble([cfg64, cfg32])
+
+
+def test_empty_ensemble_raises():
+    """An ensemble without members is rejected with a clear error."""
+    with pytest.raises(ValueError, match="at least one config"):
+        AccelSimEnsemble([])
+
+
+@pytest.mark.parametrize("use_lpf", [True, False])
+def test_batch_kernel_matches_numpy_path(monkeypatch, use_lpf):
+    """
+    The fused _accel_batch_kernel (the HAVE_NUMBA branch of step_batch) must match the
+    NumPy/sosfilt path exactly, whether or not numba is installed.
+    """
+    rng = np.random.default_rng(0)
+    a = rng.normal(scale=15.0, size=(300, 3))       # large enough to saturate at ±2 g
+    R = np.linalg.qr(rng.normal(size=(300, 3, 3)))[0]
+
+    results = []
+    for have_numba in (False, True):
+        monkeypatch.setattr(accelerometer_sim, "HAVE_NUMBA", have_numba)
+        sim = AccelSim.from_config(2, 1000.0, [0.01, -0.02, 0.03], 0.01, use_lpf, 20.0, seed=3)
+        # A single rotation first, then an (N, 3, 3) stack continuing from the primed state
+        results.append([*sim.step_batch(a[:100], R[0]), *sim.step_batch(a[100:], R[100:])])
+
+    for ref, fused in zip(*results):
+        assert np.array_equal(ref, fused)
@@ -78,40 +78,66 @@ def test_valid_config_loads_correctly(tmp_path):
     assert imu.accel_smplrt_div == 4
 
 
-def test_invalid_accel_range_raises_value_error(tmp_path):
-    """An out-of-range accelerometer 'range' code must raise ValueError during parsing."""
-    bad = replace_kv_in_section(VALID_CONFIG, "accelerometer", "range", "99")
-    cfg_path = write_cfg(tmp_path, bad)
-    imu = MPU9250(cfg_path)
-    with pytest.raises(ValueError):
-        imu.read_config()
+def test_read_config_from_string_matches_file(tmp_path):
+    """Parsing INI text from memory should populate the same fields as reading the file."""
+    cfg_path = write_cfg(tmp_path, VALID_CONFIG)
+    imu_file = MPU9250(cfg_path)
+    imu_file.read_config()
 
+    imu_text = MPU9250()
+    imu_text.read_config_from_string(VALID_CONFIG)
 
-def test_invalid_accel_dlpf_raises_value_error(tmp_path):
-    """An invalid DLPF code must raise ValueError during parsing."""
-    bad = replace_kv_in_section(VALID_CONFIG, "accelerometer", "dlpf", "5")
-    cfg_path = write_cfg(tmp_path, bad)
-    imu = MPU9250(cfg_path)
-    with pytest.raises(ValueError):
-        imu.read_config()
+    for attr in ("accel_range", "accel_dlpf", "accel_bias", "accel_odr_hz",
+                 "gyro_range", "gyro_dlpf", "gyro_bias", "gyro_odr_hz",
+                 "mag_range", "mag_mode", "mag_bias", "mag_world", "mag_odr_hz"):
+        assert getattr(imu_text, attr) == getattr(imu_file, attr)
 
 
-def test_invalid_bias_type_raises_value_error(tmp_path):
-    """Non-numeric bias values in the config must raise ValueError during parsing."""
-    bad = replace_kv_in_section(VALID_CONFIG, "accelerometer", "bias_x", "text")
-    cfg_path = write_cfg(tmp_path, bad)
-    imu = MPU9250(cfg_path)
-    with pytest.raises(ValueError):
-        imu.read_config()
+def test_parse_ini_matches_configparser():
+    """The specialized INI reader should agree with configparser on the shipped config."""
+    import configparser
+    from pathlib import Path
+    from simulators.imu_sim.lib.configparsers import _parse_ini
 
+    text = (Path(__file__).resolve().parents[1] / "config.ini").read_text(encoding="utf-8")
+    cp = configparser.ConfigParser(inline_comment_prefixes=(";",))
+    cp.read_string(text)
+    assert _parse_ini(text) == {section: dict(cp[section]) for section in cp.sections()}
 
-def test_negative_sample_rate_div_raises_type_error(tmp_path):
-    """A negative sample_rate_div must raise TypeError (expects non-negative integer)."""
-    bad = replace_kv_in_section(VALID_CONFIG, "accelerometer", "sample_rate_div", "-3")
-    cfg_path = write_cfg(tmp_path, bad)
-    imu = MPU9250(cfg_path)
-    with pytest.raises(TypeError):
-        imu.read_config()
+
+@pytest.mark.parametrize("text", [
+    "[DEFAULT]\nrange = 2\n" + VALID_CONFIG,                         # inherited defaults
+    VALID_CONFIG.replace("range = 1\n", "range = 1\n    2\n", 1),   # continuation line
+])
+def test_unsupported_ini_features_raise(text):
+    """INI features the config reader does not implement must fail loudly, not be misparsed."""
+    imu = MPU9250()
+    with pytest.raises(ValueError):
+        imu.read_config_from_string(text)
+
+
+@pytest.mark.parametrize("section, key, value, exc", [
+    ("accelerometer", "range", "99", ValueError),           # out-of-range 'range' code
+    ("accelerometer", "dlpf", "5", ValueError),             # invalid DLPF code
+    ("accelerometer", "bias_x", "text", ValueError),        # non-numeric bias value
+    ("accelerometer", "sample_rate_div", "-3", TypeError),  # expects a non-negative integer
+    ("gyroscope", "range", "99", ValueError),
+    ("gyroscope", "dlpf", "5", ValueError),
+    ("gyroscope", "bias_x", "text", ValueError),
+    ("gyroscope", "sample_rate_div", "-3", TypeError),
+    ("magnetometer", "range", "99", ValueError),
+    ("magnetometer", "mode", "99", ValueError),             # invalid measurement mode code
+    ("magnetometer", "bias_x", "text", ValueError),
+    ("magnetometer", "noise_density", "text", ValueError),  # non-numeric noise density
+    ("magnetometer", "noise_density", "-0.1", TypeError),   # expects a non-negative value
+    ("magnetometer", "world_x", "east", ValueError),        # non-numeric world field component
+])
+def test_invalid_config_value_raises(section, key, value, exc):
+    """A bad sensor value must raise the expected exception during parsing."""
+    bad = replace_kv_in_section(VALID_CONFIG, section, key, value)
+    imu = MPU9250()
+    with pytest.raises(exc):
+        imu.read_config_from_string(bad)
 
 
 def test_accel_range_rejects_invalid_type():
@@ -205,42 +231,6 @@ def test_valid_gyro_config_loads_correctly(tmp_path):
     assert imu.gyro_smplrt_div == 4
 
 
-def test_invalid_gyro_range_raises_value_error(tmp_path):
-    """An out-of-range gyroscope 'range' code must raise ValueError during parsing."""
-    bad = replace_kv_in_section(VALID_CONFIG, "gyroscope", "range", "99")
-    cfg_path = write_cfg(tmp_path, bad)
-    imu = MPU9250(cfg_path)
-    with pytest.raises(ValueError):
-        imu.read_config()
-
-
-def test_invalid_gyro_dlpf_raises_value_error(tmp_path):
-    """An invalid gyroscope DLPF code must raise ValueError during parsing."""
-    bad = replace_kv_in_section(VALID_CONFIG, "gyroscope", "dlpf", "5")
-    cfg_path = write_cfg(tmp_path, bad)
-    imu = MPU9250(cfg_path)
-    with pytest.raises(ValueError):
-        imu.read_config()
-
-
-def test_invalid_gyro_bias_type_raises_value_error(tmp_path):
-    """Non-numeric gyroscope bias values in the config must raise ValueError during parsing."""
-    bad = replace_kv_in_section(VALID_CONFIG, "gyroscope", "bias_x", "text")
-    cfg_path = write_cfg(tmp_path, bad)
-    imu = MPU9250(cfg_path)
-    with pytest.raises(ValueError):
-        imu.read_config()
-
-
-def test_negative_gyro_sample_rate_div_raises_type_error(tmp_path):
-    """A negative gyroscope sample_rate_div must raise TypeError (expects non-negative integer)."""
-    bad = replace_kv_in_section(VALID_CONFIG, "gyroscope", "sample_rate_div", "-3")
-    cfg_path = write_cfg(tmp_path, bad)
-    imu = MPU9250(cfg_path)
-    with pytest.raises(TypeError):
-        imu.read_config()
-
-
 def test_gyro_range_rejects_invalid_type():
     """Setter must reject non-int / non-enum types for gyro_range."""
     imu = MPU9250()
@@ -323,60 +313,6 @@ def test_valid_mag_config_loads_correctly(tmp_path):
     assert abs(imu.mag_odr_hz - 100.0) < 1e-12
 
 
-def test_invalid_mag_range_raises_value_error(tmp_path):
-    """An out-of-range magnetometer 'range' code must raise ValueError during parsing."""
-    bad = replace_kv_in_section(VALID_CONFIG, "magnetometer", "range", "99")
-    cfg_path = write_cfg(tmp_path, bad)
-    imu = MPU9250(cfg_path)
-    with pytest.raises(ValueError):
-        imu.read_config()
-
-
-def test_invalid_mag_mode_raises_value_error(tmp_path):
-    """An invalid magnetometer mode code must raise ValueError during parsing."""
-    bad = replace_kv_in_section(VALID_CONFIG, "magnetometer", "mode", "99")
-    cfg_path = write_cfg(tmp_path, bad)
-    imu = MPU9250(cfg_path)
-    with pytest.raises(ValueError):
-        imu.read_config()
-
-
-def test_invalid_mag_bias_type_raises_value_error(tmp_path):
-    """Non-numeric magnetometer bias values in the config must raise ValueError."""
-    bad = replace_kv_in_section(VALID_CONFIG, "magnetometer", "bias_x", "text")
-    cfg_path = write_cfg(tmp_path, bad)
-    imu = MPU9250(cfg_path)
-    with pytest.raises(ValueError):
-        imu.read_config()
-
-
-def test_invalid_mag_noise_density_type_raises_value_error(tmp_path):
-    """Non-numeric magnetometer noise_density in the config must raise ValueError."""
-    bad = replace_kv_in_section(VALID_CONFIG, "magnetometer", "noise_density", "text")
-    cfg_path = write_cfg(tmp_path, bad)
-    imu = MPU9250(cfg_path)
-    with pytest.raises(ValueError):
-        imu.read_config()
-
-
-def test_negative_mag_noise_density_raises_type_error(tmp_path):
-    """A negative magnetometer noise_density must raise TypeError."""
-    bad = replace_kv_in_section(VALID_CONFIG, "magnetometer", "noise_density", "-0.1")
-    cfg_path = write_cfg(tmp_path, bad)
-    imu = MPU9250(cfg_path)
-    with pytest.raises(TypeError):
-        imu.read_config()
-
-
-def test_invalid_mag_world_component_type_raises_value_error(tmp_path):
-    """Non-numeric magnetometer world field components must raise ValueError."""
-    bad = replace_kv_in_section(VALID_CONFIG, "magnetometer", "world_x", "east")
-    cfg_path = write_cfg(tmp_path, bad)
-    imu = MPU9250(cfg_path)
-    with pytest.raises(ValueError):
-        imu.read_config()
-
-
 def test_mag_range_rejects_invalid_type():
     """Setter must reject non-int / non-enum types for mag_range."""
     imu = MPU9250()
@@ -75,6 +75,18 @@ def write_cfg(tmp_path, content: str) -> str:
     return str(p)
 
 
+# Same as CONFIG_ALL_NO_NOISE with white noise enabled on every sensor
+CONFIG_ALL_NOISY = CONFIG_ALL_NO_NOISE.replace("noise_density = 0.0", "noise_density = 0.01")
+
+
+def noisy_imu(seed: int) -> MPU9250:
+    """Build an MPU9250 from CONFIG_ALL_NOISY with all simulators seeded from 'seed'."""
+    imu = MPU9250()
+    imu.read_config_from_string(CONFIG_ALL_NOISY)
+    imu.init_all_sims(seed=seed)
+    return imu
+
+
 def static_motion_provider(t: float):
     """
     World->sensor rotation = I, no linear accel (gravity handled in AccelSim),
@@ -86,6 +98,27 @@ def static_motion_provider(t: float):
     return a_lin_world_ms2, omega_world_dps, R
 
 
+def rotating_motion_provider(t: float):
+    """
+    Yaw rotation at 2 rad/s with a wobbling linear acceleration and a varying yaw rate.
+    """
+    c, s = math.cos(2.0 * t), math.sin(2.0 * t)
+    R = np.array([[c, -s, 0.0], [s, c, 0.0], [0.0, 0.0, 1.0]])
+    return np.array([math.sin(40.0 * t), 0.5, 0.0]), np.array([0.0, 0.0, 90.0 * c]), R
+
+
+def rotating_motion_provider_batched(t: np.ndarray):
+    """
+    Vectorized rotating_motion_provider over an array of timestamps.
+    """
+    c, s = np.cos(2.0 * t), np.sin(2.0 * t)
+    z, o = np.zeros_like(t), np.ones_like(t)
+    R = np.stack([c, -s, z, s, c, z, z, z, o], axis=-1).reshape(-1, 3, 3)
+    a_lin = np.stack([np.sin(40.0 * t), 0.5 * o, z], axis=-1)
+    omega = np.stack([z, z, 90.0 * c], axis=-1)
+    return a_lin, omega, R
+
+
 def test_simulate_counts_and_values_static(tmp_path):
     """
     With accel/gyro DLPF=ACTIVE and div=4 → fs=200 Hz; mag CONT_100HZ → 100 Hz.
@@ -188,4 +221,109 @@ def test_event_alignment_when_changing_odr(tmp_path):
 
     assert out["accel"]["t"].shape[0] == n_acc
     assert out["gyro"]["t"].shape[0]  == n_gyro
-    assert out["mag"]["t"].shape[0]   == n_mag
\ No newline at end of file
+    assert out["mag"]["t"].shape[0]   == n_mag
+
+
+def test_events_group_timestamps_relative_to_earliest_time(tmp_path):
+    """
+    A timestamp belongs to an event only if it lies within EVENT_EPS of the event's earliest
+    time, even when it is closer than that to the previous timestamp.
+    """
+    imu = MPU9250(write_cfg(tmp_path, CONFIG_ALL_NO_NOISE))
+    imu.read_config()
+    imu.init_all_sims()
+    imu._t_next_gyro = 0.8e-12
+    imu._t_next_mag  = 1.6e-12
+
+    ev_t, (acc_idx, gyro_idx, mag_idx) = imu._schedule(1e-11)
+
+    assert ev_t.tolist() == [0.0, 1.6e-12]
+    assert acc_idx.tolist() == [0] and gyro_idx.tolist() == [0] and mag_idx.tolist() == [1]
+
+
+def test_single_seed_makes_streams_reproducible():
+    """
+    init_all_sims(seed=...) must give identical noisy outputs for the same seed and
+    independent streams per sensor.
+    """
+    outs = [noisy_imu(seed=seed).simulate(0.05, static_motion_provider) for seed in (7, 7, 8)]
+
+    for key in ("accel", "gyro", "mag"):
+        assert np.array_equal(outs[0][key]["meas"], outs[1][key]["meas"])
+        assert not np.array_equal(outs[0][key]["meas"], outs[2][key]["meas"])
+
+
+def test_simulate_matches_per_sample_calls():
+    """
+    The batched simulate() must reproduce a sample_* call per scheduled timestamp,
+    including LPF state and noise streams.
+    """
+    imu_ref = noisy_imu(seed=5)
+    out = noisy_imu(seed=5).simulate(0.1, rotating_motion_provider)
+
+    for key, sample in (("accel", lambda m: imu_ref.sample_accel(m[0], m[2])),
+                        ("gyro",  lambda m: imu_ref.sample_gyro(m[1], m[2])),
+                        ("mag",   lambda m: imu_ref.sample_mag(m[2]))):
+        for t, counts, meas in zip(out[key]["t"], out[key]["counts"], out[key]["meas"]):
+            c_ref, m_ref = sample(rotating_motion_provider(t))
+            assert np.array_equal(counts, c_ref)
+            assert np.allclose(meas, m_ref, atol=1e-12)
+
+
+def test_simulate_without_motion_provider_is_static():
+    """
+    simulate() without a motion provider must match an explicit at-rest, level provider.
+    """
+    outs = [noisy_imu(seed=3).simulate(0.05, provider)
+            for provider in (None, static_motion_provider)]
+
+    for key in ("accel", "gyro", "mag"):
+        assert np.array_equal(outs[0][key]["t"], outs[1][key]["t"])
+        assert np.array_equal(outs[0][key]["counts"], outs[1][key]["counts"])
+        assert np.array_equal(outs[0][key]["meas"], outs[1][key]["meas"])
+
+
+def test_simulate_batched_matches_simulate():
+    """
+    simulate_batched() with a vectorized motion model must match simulate() with the
+    equivalent per-timestamp provider, across consecutive calls.
+    """
+    imu_ref = noisy_imu(seed=5)
+    imu_bat = noisy_imu(seed=5)
+
+    for duration in (0.05, 0.07):
+        ref = imu_ref.simulate(duration, rotating_motion_provider)
+        out = imu_bat.simulate_batched(duration, rotating_motion_provider_batched)
+        for key in ("accel", "gyro", "mag"):
+            assert np.array_equal(out[key]["t"], ref[key]["t"])
+            assert np.array_equal(out[key]["counts"], ref[key]["counts"])
+            assert np.allclose(out[key]["meas"], ref[key]["meas"], atol=1e-12)
+
+
+def test_float32_batch_matches_per_sample_within_tolerance():
+    """
+    With float32 simulators, sample_*_batch() tracks N sample_*() calls to single precision:
+    measurements within float32 tolerance and counts within 1 LSB.
+    """
+    imus = []
+    for _ in range(2):
+        imu = MPU9250()
+        imu.read_config_from_string(CONFIG_ALL_NOISY)
+        imu.init_accel_sim(seed=0, lpf_cut_hz=20.0, dtype=np.float32)
+        imu.init_gyro_sim(seed=0, lpf_cut_hz=20.0, dtype=np.float32)
+        imus.append(imu)
+    imu_bat, imu_ref = imus
+
+    t = np.arange(500) / 200.0
+    a_lin, omega, R = rotating_motion_provider_batched(t)
+    omega = omega * 3.0     # exercise larger gyro magnitudes
+
+    c_acc, a_acc = imu_bat.sample_accel_batch(a_lin, R)
+    c_gyr, w_gyr = imu_bat.sample_gyro_batch(omega, R)
+    for i in range(t.size):
+        c_ref, a_ref = imu_ref.sample_accel(a_lin[i], R[i])
+        assert np.allclose(a_acc[i], a_ref, rtol=1e-5, atol=1e-6)
+        assert np.all(np.abs(c_acc[i].astype(int) - c_ref) <= 1)
+        c_ref, w_ref = imu_ref.sample_gyro(omega[i], R[i])
+        assert np.allclose(w_gyr[i], w_ref, rtol=1e-5, atol=1e-6)
+        assert np.all(np.abs(c_gyr[i].astype(int) - c_ref) <= 1)
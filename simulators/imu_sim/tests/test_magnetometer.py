@@ -2,6 +2,8 @@ import numpy as np
 import pytest
 
 from simulators.imu_sim.lib.imu_sim import MPU9250
+from simulators.imu_sim.lib import magnetometer_sim
+from simulators.imu_sim.lib.magnetometer_sim import MagSim
 
 
 CONFIG_NO_NOISE = """
@@ -241,3 +243,40 @@ def test_mag_odr_from_mode(tmp_path):
     imu2 = MPU9250(cfg_path)
     imu2.read_config()
     assert abs(float(imu2.mag_odr_hz) - 8.0) < 1e-12
+
+
+def test_mag_filter_series_matches_recursion():
+    # One IIR sweep over a series must equal the per-sample LPF recursion, split or not
+    sim = MagSim.from_config(16, 100.0, [0.0, 0.0, 0.0], 0.0, [20.0, 0.0, 40.0], True, 5.0)
+    x = np.random.default_rng(0).normal(scale=10.0, size=(50, 3))
+
+    y = np.vstack([sim.filter_series(x[:7]), sim.filter_series(x[7:])])
+
+    alpha = sim._alpha
+    ref = np.empty_like(x)
+    ref[0] = x[0]
+    for k in range(1, x.shape[0]):
+        ref[k] = alpha * ref[k - 1] + (1.0 - alpha) * x[k]
+    assert np.allclose(y, ref, atol=1e-12)
+    assert np.allclose(sim.state, ref[-1], atol=1e-12)
+
+
+@pytest.mark.parametrize("use_lpf", [True, False])
+def test_mag_batch_kernel_matches_numpy_path(monkeypatch, use_lpf):
+    """
+    The fused _mag_batch_kernel (the HAVE_NUMBA branch of step_batch) must match the
+    NumPy/sosfilt path exactly, whether or not numba is installed.
+    """
+    rng = np.random.default_rng(0)
+    R = np.linalg.qr(rng.normal(size=(300, 3, 3)))[0]
+
+    results = []
+    for have_numba in (False, True):
+        monkeypatch.setattr(magnetometer_sim, "HAVE_NUMBA", have_numba)
+        sim = MagSim.from_config(16, 100.0, [3.0, -1.5, 0.5], 0.4, [20.0, 0.0, 40.0],
+                                 use_lpf, 10.0, seed=3)
+        # Two batches, the second continuing from the primed state
+        results.append([*sim.step_batch(R[:100]), *sim.step_batch(R[100:])])
+
+    for ref, fused in zip(*results):
+        assert np.array_equal(ref, fused)
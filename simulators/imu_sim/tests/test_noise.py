@@ -0,0 +1,15 @@
+import numpy as np
+
+from simulators.imu_sim.lib.noise import NOISE_POOL_LEN, NoisePool
+
+
+def test_take_matches_repeated_next_across_refills():
+    """take(n) must return the same stream as n next() calls, including across pool refills."""
+    single = NoisePool(np.random.default_rng(7))
+    batched = NoisePool(np.random.default_rng(7))
+
+    sizes = (5, NOISE_POOL_LEN - 3, 10, 2 * NOISE_POOL_LEN, 1)
+    # next() returns a view into the pool, so copy each row before the pool is refilled
+    expected = np.array([single.next().copy() for _ in range(sum(sizes))])
+    got = np.vstack([batched.take(n) for n in sizes])
+    assert np.array_equal(got, expected)
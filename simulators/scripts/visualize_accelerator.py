@@ -8,26 +8,6 @@ from simulators.imu_sim.lib.imu_sim import MPU9250
 
 G = 9.80665
 
-def Rx(deg: float) -> np.ndarray:
-    th = np.deg2rad(deg); c, s = np.cos(th), np.sin(th)
-    return np.array([[1, 0, 0],
-                     [0, c,-s],
-                     [0, s, c]])
-
-def Ry(deg: float) -> np.ndarray:
-    th = np.deg2rad(deg); c, s = np.cos(th), np.sin(th)
-    return np.array([[ c, 0, s],
-                     [ 0, 1, 0],
-                     [-s, 0, c]])
-
-def Rz(deg: float) -> np.ndarray:
-    th = np.deg2rad(deg); c, s = np.sin(th), np.cos(th)
-    # swap to keep standard convention
-    s, c = np.sin(th), np.cos(th)
-    return np.array([[c,-s, 0],
-                     [s, c, 0],
-                     [0, 0, 1]])
-
 def euler_R_world_to_sensor(roll_deg: float, pitch_deg: float, yaw_deg: float) -> np.ndarray:
     """
     Build world->sensor rotation. Convention used here:
@@ -36,7 +16,14 @@ def euler_R_world_to_sensor(roll_deg: float, pitch_deg: float, yaw_deg: float) -
       - Gravity is [0,0,+g] in world (ENU, Z up).
       - Roll (about X) mixes Y/Z; Pitch (about Y) mixes X/Z; Yaw (about Z) does not change gravity projection.
     """
-    return Rx(roll_deg) @ Ry(pitch_deg) @ Rz(yaw_deg)
+    r, p, y = math.radians(roll_deg), math.radians(pitch_deg), math.radians(yaw_deg)
+    cr, sr = math.cos(r), math.sin(r)
+    cp, sp = math.cos(p), math.sin(p)
+    cy, sy = math.cos(y), math.sin(y)
+    # Closed-form product, written entry by entry instead of two 3x3 matmuls
+    return np.array([[ cp * cy,                 -cp * sy,                  sp     ],
+                     [ cr * sy + sr * sp * cy,   cr * cy - sr * sp * sy,  -sr * cp],
+                     [ sr * sy - cr * sp * cy,   sr * cy + cr * sp * sy,   cr * cp]])
 
 
 def step_profile(t: float, axis: int = 0, amp_g: float = 1.0,
@@ -14,27 +14,16 @@ from simulators.imu_sim.lib.imu_sim import MPU9250
 # Rotations (degrees helpers)
 # ---------------------------
 
-def Rx(deg: float) -> np.ndarray:
-    th = np.deg2rad(deg); c, s = np.cos(th), np.sin(th)
-    return np.array([[1, 0, 0],
-                     [0, c,-s],
-                     [0, s, c]], float)
-
-def Ry(deg: float) -> np.ndarray:
-    th = np.deg2rad(deg); c, s = np.cos(th), np.sin(th)
-    return np.array([[ c, 0, s],
-                     [ 0, 1, 0],
-                     [-s, 0, c]], float)
-
-def Rz(deg: float) -> np.ndarray:
-    th = np.deg2rad(deg); c, s = np.cos(th), np.sin(th)
-    return np.array([[c,-s, 0],
-                     [s, c, 0],
-                     [0, 0, 1]], float)
-
 def euler_R_world_to_sensor(roll_deg: float, pitch_deg: float, yaw_deg: float) -> np.ndarray:
     """Compose rotation world->sensor as R = Rx(roll) @ Ry(pitch) @ Rz(yaw)."""
-    return Rx(roll_deg) @ Ry(pitch_deg) @ Rz(yaw_deg)
+    r, p, y = math.radians(roll_deg), math.radians(pitch_deg), math.radians(yaw_deg)
+    cr, sr = math.cos(r), math.sin(r)
+    cp, sp = math.cos(p), math.sin(p)
+    cy, sy = math.cos(y), math.sin(y)
+    # Closed-form product, written entry by entry instead of two 3x3 matmuls
+    return np.array([[ cp * cy,                 -cp * sy,                  sp     ],
+                     [ cr * sy + sr * sp * cy,   cr * cy - sr * sp * sy,  -sr * cp],
+                     [ sr * sy - cr * sp * cy,   sr * cy + cr * sp * sy,   cr * cp]])
 
 # ---------------------------
 # Simple boat mesh
@@ -86,6 +75,10 @@ def make_wave_motion():
     PITCH_AMP, PITCH_HZ = 8.0, 0.05
     ROLL_AMP, ROLL_HZ = 6.0, 0.35
 
+    # No linear acceleration: one shared read-only zero vector instead of a new one per tick
+    a_lin_world = np.zeros(3)
+    a_lin_world.setflags(write=False)
+
     def provider(t: float):
         yaw   = YAW_AMP   * math.sin(2*math.pi*YAW_HZ*t)
         pitch = PITCH_AMP * math.sin(2*math.pi*PITCH_HZ*t + 1.0)
@@ -96,7 +89,6 @@ def make_wave_motion():
         roll_rate  = 2*math.pi*ROLL_HZ  * ROLL_AMP  * math.cos(2*math.pi*ROLL_HZ*t + 2.0)
 
         R_ws = euler_R_world_to_sensor(roll, pitch, yaw)
-        a_lin_world = np.zeros(3)
         omega_world = np.array([roll_rate, pitch_rate, yaw_rate], float)
         return a_lin_world, omega_world, R_ws
 
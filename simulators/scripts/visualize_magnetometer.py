@@ -7,30 +7,16 @@ import matplotlib.pyplot as plt
 from simulators.imu_sim.lib.imu_sim import MPU9250
 
 
-def Rx(deg: float) -> np.ndarray:
-    """Rotation around X axis (roll), degrees."""
-    th = np.deg2rad(deg); c, s = np.cos(th), np.sin(th)
-    return np.array([[1, 0, 0],
-                     [0, c,-s],
-                     [0, s, c]])
-
-def Ry(deg: float) -> np.ndarray:
-    """Rotation around Y axis (pitch), degrees."""
-    th = np.deg2rad(deg); c, s = np.cos(th), np.sin(th)
-    return np.array([[ c, 0, s],
-                     [ 0, 1, 0],
-                     [-s, 0, c]])
-
-def Rz(deg: float) -> np.ndarray:
-    """Rotation around Z axis (yaw), degrees."""
-    th = np.deg2rad(deg); c, s = np.cos(th), np.sin(th)
-    return np.array([[c,-s, 0],
-                     [s, c, 0],
-                     [0, 0, 1]])
-
 def euler_R_world_to_sensor(roll_deg: float, pitch_deg: float, yaw_deg: float) -> np.ndarray:
     """Build world->sensor rotation: R = Rx(roll) @ Ry(pitch) @ Rz(yaw)."""
-    return Rx(roll_deg) @ Ry(pitch_deg) @ Rz(yaw_deg)
+    r, p, y = math.radians(roll_deg), math.radians(pitch_deg), math.radians(yaw_deg)
+    cr, sr = math.cos(r), math.sin(r)
+    cp, sp = math.cos(p), math.sin(p)
+    cy, sy = math.cos(y), math.sin(y)
+    # Closed-form product, written entry by entry instead of two 3x3 matmuls
+    return np.array([[ cp * cy,                 -cp * sy,                  sp     ],
+                     [ cr * sy + sr * sp * cy,   cr * cy - sr * sp * sy,  -sr * cp],
+                     [ sr * sy - cr * sp * cy,   sr * cy + cr * sp * sy,   cr * cp]])
 
 
 # --------- simple angle profiles to make the mag change over time ---------